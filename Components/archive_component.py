@@ -0,0 +1,206 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from Components.wake_word_component import normalize_text, normalize_tokens
+
+# Markers placed around matched terms in snippets; clients replace them with highlighting
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL,
+    title TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL,
+    kind TEXT NOT NULL,          -- 'segment', 'summary' or 'trigger'
+    ts REAL NOT NULL,
+    end_ts REAL,
+    text TEXT NOT NULL,
+    norm TEXT NOT NULL,          -- normalized text, so '2.0' finds 'two point oh'
+    data TEXT                    -- JSON payload: trigger outcome, or the source of a segment
+);
+CREATE INDEX IF NOT EXISTS entries_meeting_ts ON entries (meeting_id, ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    text, norm, content='entries', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, text, norm) VALUES (new.id, new.text, new.norm);
+END;
+"""
+
+
+def _fts_terms(tokens: List[str]) -> str:
+    """AND together quoted terms, so user input can't break FTS5 query syntax."""
+    return " AND ".join('"' + t.replace('"', '""') + '"' for t in tokens)
+
+
+class MeetingArchive:
+    """
+    Persistent, full-text searchable archive of meetings.
+
+    Transcript segments, summaries and trigger events are written to a
+    local SQLite database with an FTS5 index. Writes are queued and applied
+    in batched transactions by a background thread, so the detection path
+    never waits on disk.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, flush_seconds: float = 2.0):
+        """
+        Args:
+            path (str): SQLite database file (created if missing).
+            batch_size (int): Maximum writes applied in one transaction.
+            flush_seconds (float): Maximum time a write waits before being committed.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._writer = self._connect()
+        self._writer.executescript(_SCHEMA)
+        self._reader = self._connect()
+        self._reader_lock = threading.Lock()
+        self._queue = queue.Queue()
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")  # Searches don't block the writer
+        db.row_factory = sqlite3.Row
+        return db
+
+    # Writes (queued, non-blocking)
+
+    def start_meeting(self, meeting_id: str, started: Optional[float] = None, title: Optional[str] = None) -> None:
+        """Record the start of a meeting."""
+        self._queue.put((
+            "INSERT OR REPLACE INTO meetings (id, started, title) VALUES (?, ?, ?)",
+            (meeting_id, started or time.time(), title),
+        ))
+
+    def end_meeting(self, meeting_id: str, ended: Optional[float] = None) -> None:
+        """Record the end of a meeting."""
+        self._queue.put(("UPDATE meetings SET ended = ? WHERE id = ?", (ended or time.time(), meeting_id)))
+
+    def add_segment(self, meeting_id: str, start: float, end: float, text: str,
+                    source: Optional[str] = None) -> None:
+        """Archive one transcript segment, tagged with the capture source it came from."""
+        self._add(meeting_id, "segment", start, end, text, json.dumps({"source": source}) if source else None)
+
+    def add_summary(self, meeting_id: str, text: str, ts: Optional[float] = None) -> None:
+        """Archive a generated summary."""
+        self._add(meeting_id, "summary", ts or time.time(), None, text)
+
+    def add_trigger(self, meeting_id: str, words: List[str], data: Dict[str, Any], ts: Optional[float] = None) -> None:
+        """Archive a wake-word trigger and its outcome."""
+        self._add(meeting_id, "trigger", ts or time.time(), None, " ".join(words), json.dumps(data, default=str))
+
+    def _add(self, meeting_id: str, kind: str, ts: float, end_ts: Optional[float], text: str,
+             data: Optional[str] = None) -> None:
+        self._queue.put((
+            "INSERT INTO entries (meeting_id, kind, ts, end_ts, text, norm, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (meeting_id, kind, ts, end_ts, text, normalize_text(text), data),
+        ))
+
+    def flush(self) -> None:
+        """Block until every queued write has been committed."""
+        self._queue.join()
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with self._writer:
+                    for sql, params in batch:
+                        self._writer.execute(sql, params)
+            except Exception as e:
+                print(f"Error writing meeting archive: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    # Reads
+
+    def search(self, query: str, limit: int = 20, since: Optional[float] = None,
+               until: Optional[float] = None, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Full-text search across all archived meetings, best matches first.
+
+        Every word of `query` must appear; the query is matched both as
+        written and in normalized form (so "data lake 2.0" also finds
+        "data lake two point oh").
+
+        Returns:
+            List[Dict[str, Any]]: One dict per hit with the meeting id and
+            start time, entry kind, timestamp, offset into the meeting in
+            seconds, capture source (segments only), and a snippet of the
+            column that matched (the text as written, or its normalized form)
+            whose matches are wrapped in HIGHLIGHT_START / HIGHLIGHT_END.
+        """
+        raw_terms = [t for t in query.split() if t.strip()]
+        norm_terms = normalize_tokens(query)
+        if not raw_terms or not norm_terms:
+            return []
+        match = f"(text : ({_fts_terms(raw_terms)})) OR (norm : ({_fts_terms(norm_terms)}))"
+
+        sql = (
+            "SELECT e.meeting_id, e.kind, e.ts, e.end_ts, e.data, m.started, m.title, "
+            f"snippet(entries_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 16) AS snippet, "
+            "bm25(entries_fts) AS rank "
+            "FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid "
+            "JOIN meetings m ON m.id = e.meeting_id "
+            "WHERE entries_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if since is not None:
+            sql += " AND e.ts >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND e.ts < ?"
+            params.append(until)
+        if kind:
+            sql += " AND e.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        with self._reader_lock:
+            rows = self._reader.execute(sql, params).fetchall()
+        return [
+            {
+                "meeting_id": row["meeting_id"],
+                "meeting_started": row["started"],
+                "meeting_title": row["title"],
+                "kind": row["kind"],
+                "ts": row["ts"],
+                "offset": row["ts"] - row["started"],
+                "source": json.loads(row["data"]).get("source") if row["kind"] == "segment" and row["data"] else None,
+                "snippet": row["snippet"],
+                "rank": row["rank"],
+            }
+            for row in rows
+        ]
+
+    def meetings(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent meetings first."""
+        with self._reader_lock:
+            rows = self._reader.execute(
+                "SELECT id, started, ended, title FROM meetings ORDER BY started DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
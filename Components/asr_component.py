@@ -0,0 +1,376 @@
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from typing import Any, BinaryIO, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+import numpy as np
+
+
+class StreamingRecognizer:
+    """
+    Incremental recognizer for one continuous audio stream.
+
+    Audio is fed in short frames (a few hundred milliseconds). After each
+    frame the recognizer reports its current hypothesis for the utterance in
+    progress, and marks it final once the engine decides the utterance has
+    ended; the next frame then starts a new utterance.
+    """
+
+    def accept(self, pcm: memoryview) -> Tuple[str, bool]:
+        """
+        Feed one frame of 16-bit PCM.
+
+        Returns:
+            Tuple[str, bool]: The text of the current utterance so far, and
+            whether it is final.
+        """
+        raise NotImplementedError
+
+    def finish(self) -> str:
+        """Flush the utterance in progress and return its final text."""
+        raise NotImplementedError
+
+
+class TranscriptionBackend:
+    """
+    Speech-to-text engine used by the detection loop.
+
+    A backend is created once and reused for every window, so expensive
+    setup (network clients, model weights) happens a single time.
+    Implementations get each window both as an in-memory WAV file (for
+    upload-based APIs) and as raw 16-bit mono PCM (for local engines).
+    """
+
+    name = "base"
+    label = "Base"
+    supports_streaming = False
+    uploads_audio = False  # True if windows are sent over the network (and worth compressing)
+    max_concurrency = 1  # Windows that may be transcribed at the same time
+
+    def load(self) -> None:
+        """Do any expensive setup up front (e.g. load model weights)."""
+
+    def create_stream(self, rate: int) -> StreamingRecognizer:
+        """Start an incremental recognizer (only if `supports_streaming`)."""
+        raise NotImplementedError(f"The {self.name} backend does not support streaming")
+
+    def transcribe(self, wav_file: BinaryIO, pcm: memoryview, rate: int) -> str:
+        """
+        Transcribe one window.
+
+        Args:
+            wav_file (BinaryIO): The window as an audio file object (WAV, or
+                compressed for upload-based backends).
+            pcm (memoryview): The window's raw 16-bit little-endian PCM samples.
+            rate (int): Sample rate of `pcm` in Hz.
+
+        Returns:
+            str: The recognized text.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the engine's resources."""
+
+
+def _pcm_to_float(pcm: memoryview) -> np.ndarray:
+    """16-bit PCM to float32 samples in [-1, 1], as local models expect."""
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """Uploads each window to the OpenAI transcription API."""
+
+    name = "openai"
+    label = "OpenAI Whisper (cloud)"
+    uploads_audio = True
+    max_concurrency = 16
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "whisper-1", max_connections: int = 4,
+                 timeout: float = 30.0, max_retries: int = 2):
+        """
+        Args:
+            api_key (str, optional): OpenAI API key.
+            model (str): Transcription model.
+            max_connections (int): Size of the keep-alive connection pool, i.e.
+                how many uploads can be in flight without opening new connections.
+            timeout (float): Per-request timeout in seconds.
+            max_retries (int): Retries done by the SDK itself (0 when the caller retries).
+        """
+        import httpx
+        import openai
+
+        self.model = model
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            max_retries=max_retries,
+            http_client=httpx.Client(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=timeout,
+            ),
+        )
+
+    def transcribe(self, wav_file: BinaryIO, pcm: memoryview, rate: int) -> str:
+        print("📡 Sending to OpenAI Whisper API...")
+        wav_file.seek(0)
+        transcript = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=wav_file,
+        )
+        return transcript.text
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    Runs Whisper locally on the CPU with faster-whisper (CTranslate2).
+
+    Works offline; with a small int8 model ("tiny.en", "base.en") a 5 s
+    window is decoded in well under a second on a laptop CPU.
+    """
+
+    name = "faster_whisper"
+    label = "faster-whisper (local)"
+    SAMPLE_RATE = 16000
+
+    def __init__(self, model: str = "base.en", device: str = "cpu", compute_type: str = "int8",
+                 language: Optional[str] = "en", beam_size: int = 1, cpu_threads: int = 0):
+        """
+        Args:
+            model (str): Model size ("tiny.en", "base.en", ...) or path to a converted model.
+            device (str): "cpu" or "cuda".
+            compute_type (str): Weight quantization; "int8" is fastest on CPU.
+            language (str, optional): Fixed language code; None lets the model detect it.
+            beam_size (int): 1 is greedy decoding, the lowest-latency setting.
+            cpu_threads (int): Threads used for decoding (0 lets the engine choose).
+        """
+        self.model_name = model
+        self.device = device
+        self.compute_type = compute_type
+        self.language = language
+        self.beam_size = beam_size
+        self.cpu_threads = cpu_threads
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        with self._lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError as e:
+                    raise ImportError("The faster_whisper backend needs: pip install faster-whisper") from e
+                self._model = WhisperModel(self.model_name, device=self.device,
+                                           compute_type=self.compute_type, cpu_threads=self.cpu_threads)
+
+    def transcribe(self, wav_file: BinaryIO, pcm: memoryview, rate: int) -> str:
+        if rate != self.SAMPLE_RATE:
+            raise ValueError(f"faster-whisper expects {self.SAMPLE_RATE} Hz audio, got {rate} Hz")
+        self.load()
+        segments, _ = self._model.transcribe(
+            _pcm_to_float(pcm),
+            language=self.language,
+            beam_size=self.beam_size,
+            condition_on_previous_text=False,
+        )
+        return " ".join(segment.text.strip() for segment in segments)
+
+    def close(self) -> None:
+        self._model = None
+
+
+class VoskStream(StreamingRecognizer):
+    """Streaming recognition with a Vosk KaldiRecognizer."""
+
+    def __init__(self, model, rate: int):
+        import vosk
+
+        self._recognizer = vosk.KaldiRecognizer(model, rate)
+
+    def accept(self, pcm: memoryview) -> Tuple[str, bool]:
+        if self._recognizer.AcceptWaveform(bytes(pcm)):
+            return json.loads(self._recognizer.Result()).get("text", ""), True
+        return json.loads(self._recognizer.PartialResult()).get("partial", ""), False
+
+    def finish(self) -> str:
+        return json.loads(self._recognizer.FinalResult()).get("text", "")
+
+
+class VoskBackend(TranscriptionBackend):
+    """
+    Runs a Kaldi model locally with Vosk. Lighter than Whisper and works
+    offline, at some cost in accuracy. Supports streaming recognition.
+    """
+
+    name = "vosk"
+    label = "Vosk (local)"
+    supports_streaming = True
+
+    def __init__(self, model: str = "model"):
+        """
+        Args:
+            model (str): Path to an unpacked Vosk model directory.
+        """
+        self.model_path = model
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        with self._lock:
+            if self._model is None:
+                try:
+                    import vosk
+                except ImportError as e:
+                    raise ImportError("The vosk backend needs: pip install vosk") from e
+                vosk.SetLogLevel(-1)
+                self._model = vosk.Model(self.model_path)
+
+    def transcribe(self, wav_file: BinaryIO, pcm: memoryview, rate: int) -> str:
+        import vosk
+
+        self.load()
+        recognizer = vosk.KaldiRecognizer(self._model, rate)
+        recognizer.AcceptWaveform(bytes(pcm))
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+    def create_stream(self, rate: int) -> VoskStream:
+        self.load()
+        return VoskStream(self._model, rate)
+
+    def close(self) -> None:
+        self._model = None
+
+
+class TranscribedWindow(NamedTuple):
+    """Outcome of one queued window, handed back in submission order."""
+    tag: Any                     # Caller's data for the window (index, start time, buffer, ...)
+    result: Any                  # What the transcribe callable returned; None if it failed
+    error: Optional[Exception]
+    latency: float               # Seconds from submission to completion
+
+
+class TranscriptionQueue:
+    """
+    Keeps several transcriptions in flight and returns their results in
+    the order they were submitted.
+
+    With a network backend, each window costs a full round trip. Running
+    up to `max_in_flight` requests at once lets throughput keep up with
+    real time even when single requests are slow. Results are held back
+    until every earlier window has finished, so the transcript is still
+    built strictly in capture order. The caller applies backpressure by
+    not submitting while the queue is `full`. Several queues (one per
+    detection session) can share one bounded `executor`.
+    """
+
+    def __init__(self, transcribe: Callable[[Any], Any], max_in_flight: int = 4,
+                 executor: Optional[Executor] = None):
+        """
+        Args:
+            transcribe (Callable[[Any], Any]): Transcribes one window; called on worker threads.
+            max_in_flight (int): Maximum number of windows of this queue being transcribed at once.
+            executor (Executor, optional): Shared worker pool; by default the queue
+                gets its own pool of `max_in_flight` threads.
+        """
+        self.transcribe = transcribe
+        self.max_in_flight = max(1, max_in_flight)
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="asr")
+        self._pending = deque()  # (tag, future, submitted_at), oldest first
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_latency = 0.0
+        self.stall_seconds = 0.0  # Time spent waiting because the queue was full
+        self.peak_in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Windows submitted whose results have not been handed back yet."""
+        return len(self._pending)
+
+    @property
+    def full(self) -> bool:
+        return len(self._pending) >= self.max_in_flight
+
+    def submit(self, tag: Any, window: Any) -> None:
+        """Start transcribing `window`; its result is later returned with `tag`."""
+        self._pending.append((tag, self._executor.submit(self.transcribe, window), time.monotonic()))
+        self.submitted += 1
+        self.peak_in_flight = max(self.peak_in_flight, len(self._pending))
+
+    def results(self, timeout: float = 0.0) -> List[TranscribedWindow]:
+        """
+        Return finished windows in submission order.
+
+        Args:
+            timeout (float): If nothing is ready, wait up to this long for the
+                oldest window. Time spent waiting while the queue is full is
+                counted as a stall.
+        """
+        if timeout and self._pending and not self._pending[0][1].done():
+            started = time.monotonic()
+            wait([self._pending[0][1]], timeout=timeout)
+            if self.full:
+                self.stall_seconds += time.monotonic() - started
+
+        finished = []
+        while self._pending and self._pending[0][1].done():
+            tag, future, submitted_at = self._pending.popleft()
+            latency = time.monotonic() - submitted_at
+            error = future.exception()
+            if error is None:
+                self.completed += 1
+                self.total_latency += latency
+                finished.append(TranscribedWindow(tag, future.result(), None, latency))
+            else:
+                self.failed += 1
+                finished.append(TranscribedWindow(tag, None, error, latency))
+        return finished
+
+    def close(self) -> List[TranscribedWindow]:
+        """Wait for the windows still in flight and return their results."""
+        wait([future for _, future, _ in self._pending])
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+        return self.results()
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput and backpressure counters."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "mean_latency": round(self.total_latency / self.completed, 3) if self.completed else None,
+            "stall_seconds": round(self.stall_seconds, 2),
+        }
+
+
+BACKENDS: Dict[str, Type[TranscriptionBackend]] = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    VoskBackend.name: VoskBackend,
+}
+
+
+def create_backend(name: str, **options) -> TranscriptionBackend:
+    """
+    Build a transcription backend by name ("openai", "faster_whisper" or "vosk").
+
+    Args:
+        name (str): Backend name, one of BACKENDS.
+        **options: Passed to the backend's constructor (model, api_key, ...).
+    """
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcription backend {name!r}; choose from {', '.join(BACKENDS)}") from None
+    return backend_class(**options)
@@ -0,0 +1,520 @@
+import io
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pyaudio
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size ring buffer of raw PCM bytes.
+
+    The writer (the PyAudio callback) never blocks: it overwrites the oldest
+    audio once the buffer is full. Readers address audio by absolute byte
+    position since capture started, so a slow consumer can tell exactly how
+    much it missed instead of silently getting a gap.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity (int): Size of the buffer in bytes.
+        """
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._written = 0  # Total bytes ever written (monotonic)
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def written(self) -> int:
+        """Absolute position one past the newest byte in the buffer."""
+        with self._cond:
+            return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Absolute position of the oldest byte still held in the buffer."""
+        with self._cond:
+            return max(0, self._written - self.capacity)
+
+    def write(self, data: bytes) -> None:
+        """Append audio, overwriting the oldest bytes when full."""
+        size = len(data)
+        if size > self.capacity:
+            data = data[-self.capacity:]
+            skipped = size - self.capacity
+            size = self.capacity
+        else:
+            skipped = 0
+
+        with self._cond:
+            start = (self._written + skipped) % self.capacity
+            first = min(size, self.capacity - start)
+            self._buffer[start:start + first] = data[:first]
+            if first < size:
+                self._buffer[:size - first] = data[first:]
+            self._written += skipped + size
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """Wake up any waiting reader; no more audio will arrive."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def read_into(self, start: int, out: memoryview, timeout: Optional[float] = None) -> bool:
+        """
+        Copy `len(out)` bytes starting at absolute position `start` into `out`.
+
+        Blocks until the requested range has been captured. This is a single
+        copy straight from the ring into the caller's (preallocated) buffer.
+
+        Args:
+            start (int): Absolute byte position to read from.
+            out (memoryview): Writable destination buffer.
+            timeout (float, optional): Maximum time to wait for the audio.
+
+        Returns:
+            bool: True if `out` was filled, False on timeout / close.
+
+        Raises:
+            BufferOverrun: If `start` has already been overwritten.
+        """
+        length = len(out)
+        with self._cond:
+            end = start + length
+            if not self._cond.wait_for(lambda: self._closed or self._written >= end, timeout):
+                return False
+            if self._written < end:
+                return False
+            if start < self._written - self.capacity:
+                raise BufferOverrun(start, self._written - self.capacity)
+
+            offset = start % self.capacity
+            first = min(length, self.capacity - offset)
+            out[:first] = self._buffer[offset:offset + first]
+            if first < length:
+                out[first:] = self._buffer[:length - first]
+            return True
+
+
+class BufferOverrun(Exception):
+    """Raised when a reader asks for audio the ring buffer has already dropped."""
+
+    def __init__(self, requested: int, oldest: int):
+        super().__init__(f"Audio at byte {requested} was overwritten (oldest available: {oldest})")
+        self.requested = requested
+        self.oldest = oldest
+
+
+class CaptureSource(NamedTuple):
+    """One audio source to monitor: an input device, or one channel of it."""
+    device_index: Optional[int]    # PyAudio device index (None = system default input)
+    channel: Optional[int] = None  # 0-based channel of a multi-channel device; None captures mono
+    label: str = ""                # Name transcripts and events are tagged with
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"device_index": self.device_index, "channel": self.channel, "label": self.label}
+
+
+def list_input_devices(audio: pyaudio.PyAudio) -> List[Dict[str, Any]]:
+    """
+    Every device that can record, with its index, name, input channel
+    count, default sample rate and host API.
+    """
+    try:
+        default_index = audio.get_default_input_device_info()["index"]
+    except (IOError, OSError):
+        default_index = None  # No default input device
+    devices = []
+    for i in range(audio.get_device_count()):
+        info = audio.get_device_info_by_index(i)
+        if info.get("maxInputChannels", 0) < 1:
+            continue
+        devices.append({
+            "index": i,
+            "name": info["name"],
+            "channels": info["maxInputChannels"],
+            "default_sample_rate": info.get("defaultSampleRate"),
+            "host_api": audio.get_host_api_info_by_index(info["hostApi"])["name"] if "hostApi" in info else None,
+            "default": i == default_index,
+        })
+    return devices
+
+
+class CaptureStream:
+    """
+    Long-lived callback-mode PyAudio input stream feeding an AudioRingBuffer.
+
+    Capture runs on PortAudio's own thread, so it keeps going no matter how
+    long the consumer spends transcribing a window. With `input_channels`,
+    the device is opened once with all its channels up to the highest one
+    selected, and each selected channel is split into its own mono ring
+    buffer, read through channel(). Each channel of a multi-channel
+    interface can then be monitored as a separate source without opening
+    the device more than once.
+    """
+
+    def __init__(
+        self,
+        audio: pyaudio.PyAudio,
+        device_index: Optional[int],
+        rate: int = 16000,
+        channels: int = 1,
+        sample_format: int = pyaudio.paInt16,
+        chunk: int = 1024,
+        buffer_seconds: float = 60.0,
+        input_channels: Optional[Sequence[int]] = None,
+    ):
+        """
+        Args:
+            audio (pyaudio.PyAudio): Initialized PyAudio instance.
+            device_index (int, optional): Input device to open.
+            rate (int): Sample rate in Hz.
+            channels (int): Number of input channels.
+            sample_format (int): PyAudio sample format constant.
+            chunk (int): Frames per PortAudio callback.
+            buffer_seconds (float): How much audio each ring buffer keeps.
+            input_channels (Sequence[int], optional): Split these 0-based channels of
+                the device into separate mono buffers (`channels` is then ignored).
+        """
+        self.audio = audio
+        self.device_index = device_index
+        self.rate = rate
+        self.input_channels = sorted(set(input_channels)) if input_channels else None
+        self.channels = 1 if self.input_channels else channels
+        self.sample_format = sample_format
+        self.chunk = chunk
+        self.sample_width = audio.get_sample_size(sample_format)
+        self.bytes_per_second = rate * self.channels * self.sample_width
+        if self.input_channels:
+            self.ring = None  # Read each channel through channel()
+            self.rings = {c: AudioRingBuffer(self.seconds_to_bytes(buffer_seconds)) for c in self.input_channels}
+        else:
+            self.ring = AudioRingBuffer(self.seconds_to_bytes(buffer_seconds))
+            self.rings = {}
+        self.overflows = 0  # PortAudio callbacks that reported lost input
+        self.started_at = None  # Wall-clock time of ring buffer position 0
+        self._stream = None
+        self._open_channels = 0
+        self._lock = threading.Lock()
+
+    def channel(self, index: int) -> "CaptureChannel":
+        """
+        Mono view of one of the `input_channels`. Stopping every view
+        returned stops the stream.
+        """
+        with self._lock:
+            self._open_channels += 1
+        return CaptureChannel(self, index, self.rings[index])
+
+    def _release_channel(self) -> None:
+        with self._lock:
+            self._open_channels -= 1
+            last = self._open_channels == 0
+        if last:
+            self.stop()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        if status & pyaudio.paInputOverflow:
+            self.overflows += 1
+        if self.input_channels:
+            frames = np.frombuffer(in_data, dtype=self._dtype).reshape(-1, self.input_channels[-1] + 1)
+            for index, ring in self.rings.items():
+                ring.write(frames[:, index].tobytes())
+        else:
+            self.ring.write(in_data)
+        return (None, pyaudio.paContinue)
+
+    def start(self) -> None:
+        """Open the input stream and begin filling the ring buffer(s)."""
+        if self._stream is not None:
+            return
+        if self.input_channels:
+            self._dtype = np.dtype(f"<i{self.sample_width}")
+        self._stream = self.audio.open(format=self.sample_format,
+                                       channels=self.input_channels[-1] + 1 if self.input_channels
+                                       else self.channels,
+                                       rate=self.rate,
+                                       input=True,
+                                       frames_per_buffer=self.chunk,
+                                       input_device_index=self.device_index,
+                                       stream_callback=self._callback)
+        self.started_at = time.time()
+        self._stream.start_stream()
+
+    def stop(self) -> None:
+        """Stop capturing and release any reader blocked on the buffers."""
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        for ring in self.rings.values() if self.input_channels else (self.ring,):
+            ring.close()
+
+    def position_to_time(self, position: int) -> float:
+        """Wall-clock time at which the byte at `position` was captured."""
+        return self.started_at + position / self.bytes_per_second
+
+    def seconds_to_bytes(self, seconds: float) -> int:
+        """Convert a duration to a byte count aligned to whole frames."""
+        frame_size = self.channels * self.sample_width
+        return int(seconds * self.rate) * frame_size
+
+
+class CaptureChannel:
+    """
+    One channel of a multi-channel CaptureStream, used wherever a mono
+    CaptureStream is (WindowReader, position_to_time, stop).
+    """
+
+    def __init__(self, capture: CaptureStream, index: int, ring: AudioRingBuffer):
+        self.capture = capture
+        self.index = index
+        self.ring = ring
+        self.rate = capture.rate
+        self.channels = 1
+        self.sample_width = capture.sample_width
+        self.bytes_per_second = capture.bytes_per_second
+        self._stopped = False
+
+    @property
+    def started_at(self) -> Optional[float]:
+        return self.capture.started_at
+
+    @property
+    def overflows(self) -> int:
+        """Input overflows of the device stream (shared by all its channels)."""
+        return self.capture.overflows
+
+    def stop(self) -> None:
+        """Let go of this channel; the device stream stops with its last channel."""
+        if not self._stopped:
+            self._stopped = True
+            self.capture._release_channel()
+
+    def position_to_time(self, position: int) -> float:
+        return self.capture.position_to_time(position)
+
+    def seconds_to_bytes(self, seconds: float) -> int:
+        return self.capture.seconds_to_bytes(seconds)
+
+
+class WindowReader:
+    """
+    Consumer side of the capture pipeline: pulls fixed-length windows out of
+    a CaptureStream's ring buffer.
+
+    Consecutive windows start `hop_seconds` apart. With a hop shorter than
+    the window, neighbouring windows overlap so words spoken across a
+    boundary appear whole in at least one of them.
+    """
+
+    def __init__(self, capture: CaptureStream, window_seconds: float, hop_seconds: Optional[float] = None):
+        """
+        Args:
+            capture (CaptureStream): Stream whose ring buffer is read.
+            window_seconds (float): Length of each window.
+            hop_seconds (float, optional): Distance between window starts.
+                Defaults to `window_seconds` (no overlap).
+        """
+        self.capture = capture
+        self.window_bytes = capture.seconds_to_bytes(window_seconds)
+        self.hop_bytes = capture.seconds_to_bytes(hop_seconds) if hop_seconds else self.window_bytes
+        self.position = capture.ring.written
+        self.window_start = None  # Start position of the last window read
+        self.dropped_bytes = 0
+
+    def next_window_into(self, out: memoryview, timeout: Optional[float] = None) -> bool:
+        """
+        Fill `out` with the next window of audio.
+
+        If the consumer fell so far behind that the window was overwritten,
+        skip ahead to the oldest audio still buffered and count the loss.
+
+        Returns:
+            bool: True if a window was read, False if none arrived in time.
+        """
+        while True:
+            try:
+                filled = self.capture.ring.read_into(self.position, out[:self.window_bytes], timeout)
+            except BufferOverrun as e:
+                self.dropped_bytes += e.oldest - self.position
+                self.position = e.oldest
+                continue
+            if filled:
+                self.window_start = self.position
+                self.position += self.hop_bytes
+            return filled
+
+    @property
+    def lag_seconds(self) -> float:
+        """How far the consumer is behind live capture."""
+        return (self.capture.ring.written - self.position) / self.capture.bytes_per_second
+
+
+def wav_header(num_bytes: int, rate: int, channels: int, sample_width: int) -> bytes:
+    """Build a 44-byte PCM WAV header for `num_bytes` of audio data."""
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + num_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, rate, rate * block_align, block_align, sample_width * 8,
+        b"data", num_bytes,
+    )
+
+
+class WavWindowBuffer:
+    """
+    Preallocated in-memory WAV file holding one analysis window.
+
+    The header is written once; each window is copied from the ring buffer
+    directly into the PCM region, and `file` can be handed to an upload
+    client as-is. Nothing touches the disk and nothing is joined per chunk.
+    """
+
+    def __init__(self, num_bytes: int, rate: int, channels: int, sample_width: int, name: str = "window.wav"):
+        """
+        Args:
+            num_bytes (int): Size of the PCM payload (one window).
+            rate (int): Sample rate in Hz.
+            channels (int): Number of channels.
+            sample_width (int): Bytes per sample.
+            name (str): Filename reported to upload clients.
+        """
+        header = wav_header(num_bytes, rate, channels, sample_width)
+        self.header_size = len(header)
+        self.num_bytes = num_bytes
+        self.file = io.BytesIO(header + bytes(num_bytes))
+        self.file.name = name
+
+    def fill(self, reader: WindowReader, timeout: Optional[float] = None) -> bool:
+        """
+        Read the next window from `reader` into this buffer.
+
+        Returns:
+            bool: True if a window was read, False if none arrived in time.
+        """
+        with self.file.getbuffer() as view:
+            filled = reader.next_window_into(view[self.header_size:], timeout)
+        self.file.seek(0)
+        return filled
+
+    def pcm(self) -> memoryview:
+        """Read-only view of the PCM payload of the current window."""
+        return self.file.getbuffer()[self.header_size:].toreadonly()
+
+    def save(self, path: str) -> str:
+        """Write the current window to disk (debug mode only)."""
+        with open(path, "wb") as f:
+            f.write(self.file.getbuffer())
+        return path
+
+
+class UploadEncoder:
+    """
+    Compresses a window's PCM before it is uploaded for transcription.
+
+    FLAC is lossless but only shrinks noisy meeting audio by a third or so.
+    Vorbis and Opus in an Ogg container are lossy and 6-10x smaller; Vorbis
+    encodes a 5 s window in about 20 ms, while libsndfile's Opus encoder is
+    roughly ten times slower. Encoding runs in-process with soundfile
+    (libsndfile), on whichever thread calls `encode`. The sizes and encode
+    time of every window are counted so the saving can be reported.
+    """
+
+    # codec -> (soundfile format, subtype, file extension)
+    CODECS = {
+        "wav": None,
+        "flac": ("FLAC", "PCM_16", ".flac"),
+        "ogg": ("OGG", "VORBIS", ".ogg"),
+        "opus": ("OGG", "OPUS", ".ogg"),
+    }
+
+    def __init__(self, codec: str, rate: int, channels: int = 1, compression_level: Optional[float] = None):
+        """
+        Args:
+            codec (str): "wav" (no compression), "flac", "ogg" (Vorbis) or "opus".
+            rate (int): Sample rate in Hz.
+            channels (int): Number of channels.
+            compression_level (float, optional): 0 (largest, fastest) to 1
+                (smallest); None keeps libsndfile's default.
+
+        Raises:
+            ValueError: If the codec is unknown or not supported by the installed libsndfile.
+            ImportError: If a compressed codec is requested and soundfile is not installed.
+        """
+        if codec not in self.CODECS:
+            raise ValueError(f"Unknown upload codec {codec!r}; choose from {', '.join(self.CODECS)}")
+        self.codec = codec
+        self.rate = rate
+        self.channels = channels
+        self._options = {} if compression_level is None else {"compression_level": compression_level}
+        self._soundfile = None
+        if self.CODECS[codec]:
+            try:
+                import soundfile
+            except ImportError as e:
+                raise ImportError(f"The {codec} upload codec needs: pip install soundfile") from e
+            file_format, subtype, _ = self.CODECS[codec]
+            if not soundfile.check_format(file_format, subtype):
+                raise ValueError(f"The installed libsndfile cannot write {codec}")
+            self._soundfile = soundfile
+
+        self.windows = 0
+        self.raw_bytes = 0
+        self.encoded_bytes = 0
+        self.encode_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def encode(self, wav: "WavWindowBuffer") -> Tuple[BinaryIO, Dict[str, Any]]:
+        """
+        Encode the window in `wav`.
+
+        Returns:
+            Tuple[BinaryIO, Dict[str, Any]]: A file object ready to upload,
+            and this window's codec, raw and encoded sizes in bytes, and
+            encode time in milliseconds.
+        """
+        started = time.perf_counter()
+        raw_size = wav.header_size + wav.num_bytes
+        if self._soundfile is None:
+            wav.file.seek(0)
+            upload = wav.file
+        else:
+            file_format, subtype, extension = self.CODECS[self.codec]
+            with wav.pcm() as pcm:
+                samples = np.frombuffer(pcm, dtype=np.int16).reshape(-1, self.channels)
+                upload = io.BytesIO()
+                upload.name = "window" + extension
+                self._soundfile.write(upload, samples, self.rate, format=file_format, subtype=subtype,
+                                      **self._options)
+            upload.seek(0)
+        elapsed = time.perf_counter() - started
+        encoded_size = upload.getbuffer().nbytes
+
+        with self._lock:
+            self.windows += 1
+            self.raw_bytes += raw_size
+            self.encoded_bytes += encoded_size
+            self.encode_seconds += elapsed
+        return upload, {
+            "codec": self.codec,
+            "raw_bytes": raw_size,
+            "encoded_bytes": encoded_size,
+            "encode_ms": round(elapsed * 1000, 2),
+        }
+
+    def summary(self) -> str:
+        """Human-readable totals for the log."""
+        if not self.windows:
+            return f"Upload encoder ({self.codec}): no windows encoded."
+        saved = self.raw_bytes - self.encoded_bytes
+        return (f"Upload encoder ({self.codec}): {self.windows} windows, "
+                f"{self.raw_bytes / 1024:.0f} KB -> {self.encoded_bytes / 1024:.0f} KB "
+                f"({saved / 1024:.0f} KB saved, {self.raw_bytes / max(self.encoded_bytes, 1):.1f}x smaller), "
+                f"{self.encode_seconds / self.windows * 1000:.1f} ms per window")
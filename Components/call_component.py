@@ -1,9 +1,68 @@
-from twilio.rest import Client
 import configparser
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 # os.chdir("Components")
 
+# Twilio clients keep a pooled HTTP session, so reuse one per account
+_clients: Dict[Tuple[str, str], "Client"] = {}
+_clients_lock = threading.Lock()
+
+# Seconds before a Twilio HTTP request is abandoned
+TWILIO_HTTP_TIMEOUT = 10
+
+def get_twilio_client(sid, token):
+    """
+    Return a cached Twilio client for these credentials, creating it on first use.
+    The Twilio SDK is only imported then, so importing this module stays fast.
+    """
+    from twilio.http.http_client import TwilioHttpClient
+    from twilio.rest import Client
+
+    with _clients_lock:
+        client = _clients.get((sid, token))
+        if client is None:
+            client = Client(sid, token, http_client=TwilioHttpClient(timeout=TWILIO_HTTP_TIMEOUT))
+            _clients[(sid, token)] = client
+        return client
+
+def call_was_not_placed(error):
+    """
+    Whether a failed calls.create() surely placed no call, so sending it
+    again cannot ring the phone twice: Twilio rejected it with 429, or the
+    connection was never established. Read timeouts and connections reset
+    mid-request are not safe; Twilio may have accepted the call.
+    """
+    if getattr(error, "status", None) == 429:
+        return True
+    from requests.exceptions import ConnectionError, ConnectTimeout
+    from urllib3.exceptions import NewConnectionError
+
+    if isinstance(error, ConnectTimeout):
+        return True
+    if isinstance(error, ConnectionError) and error.args:
+        reason = getattr(error.args[0], "reason", error.args[0])  # urllib3 wraps it in MaxRetryError
+        return isinstance(reason, NewConnectionError)
+    return False
+
+def clear_twilio_clients():
+    """Forget cached clients, e.g. after the credentials were changed."""
+    with _clients_lock:
+        _clients.clear()
+
+def build_twiml(message):
+    """TwiML that tells Twilio what to say during the call."""
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="alice">{message}</Say>
+    <Pause length="1"/>
+    <Say voice="alice">Call completed. Goodbye!</Say>
+</Response>'''
+
 def make_phone_call(message="Hello! You have been called by the Laziness-101", sid=None, token=None, phone_number=None, twilio_phone=None):
     # Check if config file exists
     # if not os.path.exists('Components/twilio_config.ignore'):
@@ -41,17 +100,12 @@ def make_phone_call(message="Hello! You have been called by the Laziness-101", s
         print(f"Error: Missing configuration: {e}")
         return False
     
-    # Initialize the Twilio client
-    client = Client(account_sid, auth_token)
+    # Reuse the pooled Twilio client for these credentials
+    client = get_twilio_client(account_sid, auth_token)
     
     try:
         # Create TwiML - This is the XML that tells Twilio what to say/do during the call
-        twiml = f'''<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="alice">{message}</Say>
-    <Pause length="1"/>
-    <Say voice="alice">Call completed. Goodbye!</Say>
-</Response>'''
+        twiml = build_twiml(message)
         
         # Make a call using the TwiML directly
         call = client.calls.create(
@@ -69,6 +123,135 @@ def make_phone_call(message="Hello! You have been called by the Laziness-101", s
         print("Detailed error information:", str(e))
         return False
 
+class NotificationDispatcher:
+    """
+    Places phone calls in the background so callers never wait on Twilio.
+
+    `dispatch` returns immediately with a Future. The first request for a
+    recipient is placed right away; requests that arrive while it is still
+    queued are merged into it, and a recipient that was called less than
+    `cooldown_seconds` ago is not called again. Every outcome is reported to
+    `on_event` as a dict and also resolves the request's Future. With a
+    `resilience` policy, calls get a deadline, retries and a circuit breaker.
+    """
+
+    def __init__(
+        self,
+        on_event: Optional[Callable[[dict], None]] = None,
+        cooldown_seconds: float = 60.0,
+        workers: int = 2,
+        resilience: Optional[Callable[..., Any]] = None,
+    ):
+        """
+        Args:
+            on_event (Callable[[dict], None], optional): Receives call outcome events.
+            cooldown_seconds (float): Minimum time between two calls to the same recipient.
+            workers (int): Number of calls that may be in flight at once.
+            resilience (ResilientCall, optional): Policy that places each call,
+                called as resilience(fn, **kwargs).
+        """
+        self.on_event = on_event
+        self.cooldown_seconds = cooldown_seconds
+        self.resilience = resilience
+        self._queue = queue.Queue()
+        self._pending: Dict[str, dict] = {}
+        self._last_call: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def dispatch(
+        self,
+        phone_number: str,
+        sid: str,
+        token: str,
+        twilio_phone: str,
+        reasons: Iterable[str] = (),
+        message: str = "Hello! You have been called by the Laziness-101",
+    ) -> Future:
+        """
+        Queue a call to `phone_number` without blocking.
+
+        Returns:
+            Future: Resolves to the outcome event dict of the call this
+            request ended up in (shared by merged requests).
+        """
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending.get(phone_number)
+            if pending is not None:
+                pending["reasons"].extend(r for r in reasons if r not in pending["reasons"])
+                return pending["future"]
+
+            last = self._last_call.get(phone_number)
+            if last is not None and now - last < self.cooldown_seconds:
+                event = {
+                    "type": "call_suppressed",
+                    "to": phone_number,
+                    "reasons": list(reasons),
+                    "retry_in": round(self.cooldown_seconds - (now - last), 1),
+                }
+                future = Future()
+                future.set_result(event)
+                self._emit(event)
+                return future
+
+            pending = {
+                "phone_number": phone_number,
+                "sid": sid,
+                "token": token,
+                "twilio_phone": twilio_phone,
+                "message": message,
+                "reasons": list(dict.fromkeys(reasons)),
+                "requested": now,
+                "future": Future(),
+            }
+            self._pending[phone_number] = pending
+
+        self._queue.put(phone_number)
+        return pending["future"]
+
+    def _emit(self, event: dict) -> None:
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                print(f"Error handling call event: {e}")
+
+    def _worker(self) -> None:
+        while True:
+            phone_number = self._queue.get()
+            with self._lock:
+                request = self._pending.pop(phone_number, None)
+                if request is None:
+                    continue
+                # Claim the cooldown now so requests arriving mid-call are suppressed
+                self._last_call[phone_number] = time.monotonic()
+
+            started = time.monotonic()
+            event = {"to": phone_number, "reasons": request["reasons"]}
+            try:
+                client = get_twilio_client(request["sid"], request["token"])
+                call_kwargs = {
+                    "to": phone_number,
+                    "from_": request["twilio_phone"],
+                    "twiml": build_twiml(request["message"]),
+                }
+                if self.resilience is not None:
+                    call = self.resilience(client.calls.create, **call_kwargs)
+                else:
+                    call = client.calls.create(**call_kwargs)
+                event.update(type="call_sent", call_sid=call.sid)
+            except Exception as e:
+                with self._lock:
+                    self._last_call.pop(phone_number, None)  # Allow an immediate retry
+                event.update(type="call_failed", error=str(e))
+            event["latency"] = round(time.monotonic() - started, 3)
+            event["queued"] = round(started - request["requested"], 3)
+
+            request["future"].set_result(event)
+            self._emit(event)
+
 if __name__ == "__main__":
     # You can customize the message here
     custom_message = "Yo mama!"
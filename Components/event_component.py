@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Event:
+    """
+    One structured event: a type the frontend dispatches on, when it
+    happened, which detection session it belongs to, and a payload dict.
+    """
+
+    __slots__ = ("seq", "type", "ts", "session_id", "payload", "_json")
+
+    def __init__(self, seq: int, event_type: str, payload: Dict[str, Any],
+                 session_id: Optional[str] = None, ts: Optional[float] = None):
+        self.seq = seq
+        self.type = event_type
+        self.ts = time.time() if ts is None else ts
+        self.session_id = session_id
+        self.payload = payload
+        self._json = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict form, as sent to clients."""
+        return {
+            "seq": self.seq,
+            "type": self.type,
+            "ts": self.ts,
+            "session_id": self.session_id,
+            "payload": self.payload,
+        }
+
+    def to_json(self) -> str:
+        """JSON form, serialized once and shared by every subscriber."""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict())
+        return self._json
+
+    def __repr__(self) -> str:
+        return f"Event({self.seq}, {self.type!r}, {self.payload!r})"
+
+
+class EventLog:
+    """
+    Bounded in-memory stream of Events with monotonically increasing
+    sequence numbers.
+
+    Only the newest `capacity` events are kept. Readers keep a cursor (the
+    last sequence number they have seen) and ask for what came after it, so
+    each poll only transfers the delta. Push readers block in `wait_since`
+    on a shared condition until something is published, so any number of
+    subscribers cost nothing while the stream is idle.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Args:
+            capacity (int): Maximum number of events kept in memory.
+        """
+        self._events = deque(maxlen=capacity)  # Oldest first
+        self._last_seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest event (0 if nothing was published yet)."""
+        return self._last_seq
+
+    def publish(self, event_type: str, payload: Optional[Dict[str, Any]] = None,
+                session_id: Optional[str] = None) -> Event:
+        """Append a new event and return it."""
+        with self._cond:
+            self._last_seq += 1
+            event = Event(self._last_seq, event_type, payload or {}, session_id)
+            self._events.append(event)
+            self._cond.notify_all()
+            return event
+
+    def since(self, seq: int) -> Tuple[List[Event], int, bool]:
+        """
+        Return events newer than `seq`.
+
+        Returns:
+            Tuple[List[Event], int, bool]: The events, the cursor to pass
+            next time, and whether events between `seq` and the oldest one
+            kept were already dropped.
+        """
+        with self._cond:
+            return self._since(seq)
+
+    def wait_since(self, seq: int, timeout: Optional[float] = None) -> Tuple[List[Event], int, bool]:
+        """
+        Like `since`, but block until there is something newer than `seq`
+        or `timeout` seconds have passed.
+        """
+        with self._cond:
+            if seq > self._last_seq:
+                seq = 0  # Cursor from before a restart: start over
+            self._cond.wait_for(lambda: self._last_seq > seq, timeout)
+            return self._since(seq)
+
+    def _since(self, seq: int) -> Tuple[List[Event], int, bool]:
+        if seq > self._last_seq:
+            seq = 0  # Cursor from before a restart: start over
+        if seq == self._last_seq:
+            return [], self._last_seq, False
+        oldest = self._events[0].seq if self._events else self._last_seq + 1
+        # Sequence numbers are contiguous, so the start index is computed directly
+        start = max(0, seq + 1 - oldest)
+        events = list(islice(self._events, start, None))
+        return events, self._last_seq, seq + 1 < oldest
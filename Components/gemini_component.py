@@ -1,9 +1,34 @@
-import google.generativeai as genai
 import os
+import re
 import json
+import time
+import threading
 import configparser
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator, Union
+
+# Rough characters-per-token ratio for English text, used for input budgeting
+CHARS_PER_TOKEN = 4
+
+MAP_PROMPT = (
+    "The following is one part of a meeting transcript. Summarize it concisely, keeping every "
+    "decision, question, action item and name that was mentioned.\n\nTranscript part:\n```{text}```"
+)
+MERGE_PROMPT = (
+    "The following are summaries of consecutive parts of one meeting. Merge them into a single "
+    "concise summary, keeping every decision, question, action item and name.\n\nSummaries:\n{text}"
+)
+FINAL_PROMPT = "{instructions}\n\n{text}"
+
+# Cached model clients, keyed by (api_key, model, generation config, safety settings).
+# genai.configure() is process-global, so configuring and binding a client
+# happen together under one lock.
+_model_cache: Dict[tuple, "genai.GenerativeModel"] = {}
+_model_cache_lock = threading.Lock()
+_configured_api_key: Optional[str] = None
+_resolved_api_keys: Dict[Optional[str], str] = {}
 
 def load_api_key(config_file: Optional[str] = None) -> str:
     """
@@ -85,6 +110,125 @@ def load_api_key(config_file: Optional[str] = None) -> str:
         f"No API key found. Please provide a config file or create one of: {', '.join(default_files)}"
     )
 
+def resolve_api_key(api_key: Optional[str] = None, config_file: Optional[str] = None) -> str:
+    """
+    Return the Gemini API key to use, probing config files only once.
+
+    Priority: explicit `api_key`, then `config_file` / the default config
+    files, then the GOOGLE_API_KEY environment variable. The result of the
+    config file probe is cached until invalidate_gemini_clients() is called.
+
+    Raises:
+        ValueError: If no API key can be found
+    """
+    if api_key:
+        return api_key
+    with _model_cache_lock:
+        cached = _resolved_api_keys.get(config_file)
+    if cached:
+        return cached
+
+    try:
+        # First try to load from config file
+        api_key = load_api_key(config_file)
+    except FileNotFoundError:
+        # Fall back to environment variable
+        api_key = os.environ.get("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError(
+                "API key must be provided, set in a config file, or set as GOOGLE_API_KEY environment variable"
+            )
+    with _model_cache_lock:
+        _resolved_api_keys[config_file] = api_key
+    return api_key
+
+def get_gemini_model(
+    api_key: str,
+    model: str = "gemini-1.5-pro",
+    generation_config: Optional[Dict[str, Any]] = None,
+    safety_settings: Optional[List[Dict[str, Any]]] = None
+) -> "genai.GenerativeModel":
+    """
+    Return a cached GenerativeModel for this key and configuration, creating it on first use.
+    
+    Args:
+        api_key (str): Google API key.
+        model (str): Gemini model name.
+        generation_config (Dict[str, Any], optional): Generation parameters.
+        safety_settings (List[Dict[str, Any]], optional): Safety settings configuration.
+        
+    Returns:
+        genai.GenerativeModel: A model instance bound to `api_key`.
+    """
+    global _configured_api_key
+    import google.generativeai as genai  # Imported on first use; the SDK takes a while to load
+
+    key = (api_key, model, tuple(sorted((generation_config or {}).items())), repr(safety_settings))
+    with _model_cache_lock:
+        instance = _model_cache.get(key)
+        if instance is not None:
+            return instance
+
+        if _configured_api_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+        instance = genai.GenerativeModel(
+            model_name=model,
+            generation_config=generation_config,
+            safety_settings=safety_settings
+        )
+        # The SDK binds the transport client lazily from the global
+        # configuration; bind it now, while this key is the configured one,
+        # so a later configure() for another key cannot redirect this model.
+        if getattr(instance, "_client", False) is None:
+            from google.generativeai import client as genai_client
+            instance._client = genai_client.get_default_generative_client()
+        _model_cache[key] = instance
+        return instance
+
+def invalidate_gemini_clients() -> None:
+    """
+    Drop every cached model and resolved API key. Call when API keys change.
+    """
+    global _configured_api_key
+    with _model_cache_lock:
+        _model_cache.clear()
+        _resolved_api_keys.clear()
+        _configured_api_key = None
+
+def warm_up_gemini(
+    api_key: Optional[str] = None,
+    config_file: Optional[str] = None,
+    model: str = "gemini-1.5-pro",
+    temperature: float = 0.7,
+    max_output_tokens: int = 2048,
+    top_p: float = 0.95,
+    top_k: int = 64,
+    request_timeout: Optional[float] = None
+) -> bool:
+    """
+    Create and cache the model prompt_gemini() will use with these settings,
+    and open its connection with a cheap token-count request, so the first
+    real prompt pays no setup cost. `request_timeout` bounds that request
+    in seconds.
+    
+    Returns:
+        bool: True if the warm-up request succeeded.
+    """
+    generation_config = {
+        "temperature": temperature,
+        "top_p": top_p,
+        "top_k": top_k,
+        "max_output_tokens": max_output_tokens,
+    }
+    try:
+        instance = get_gemini_model(resolve_api_key(api_key, config_file), model, generation_config)
+        instance.count_tokens("warm-up", **_request_options(request_timeout))
+        return True
+    except Exception as e:
+        print(f"Gemini warm-up failed: {e}")
+        return False
+
 def prompt_gemini(
     prompt: str,
     config_file: Optional[str] = None,
@@ -94,11 +238,17 @@ def prompt_gemini(
     max_output_tokens: int = 2048,
     top_p: float = 0.95,
     top_k: int = 64,
-    safety_settings: Optional[List[Dict[str, Any]]] = None
-) -> str:
+    safety_settings: Optional[List[Dict[str, Any]]] = None,
+    stream: bool = False,
+    resilience: Optional[Callable[..., Any]] = None,
+    request_timeout: Optional[float] = None
+) -> Union[str, Iterator[str]]:
     """
     Sends a prompt to Google Gemini API and returns the response.
     
+    With `stream=True`, returns an iterator that yields text chunks as
+    Gemini produces them instead of waiting for the full response.
+    
     Args:
         prompt (str): The prompt text to send to Gemini.
         config_file (str, optional): Path to configuration file containing the API key.
@@ -109,30 +259,21 @@ def prompt_gemini(
         top_p (float): Nucleus sampling parameter. Range: [0.0, 1.0]
         top_k (int): Number of highest probability tokens to consider for each step. Range: [1, 100]
         safety_settings (List[Dict[str, Any]], optional): Safety settings configuration.
+        stream (bool): Yield the response incrementally.
+        resilience (ResilientCall, optional): Deadline / retry / circuit-breaker policy
+            for the request. When streaming it covers the wait for the first chunk.
+        request_timeout (float, optional): Seconds before the SDK itself abandons a
+            request, so an attempt the policy gave up on does not keep its thread.
         
     Returns:
-        str: Text response from Gemini
+        str: Text response from Gemini (an iterator of text chunks if `stream` is True)
         
     Raises:
         ValueError: If API key is not provided and cannot be loaded
         Exception: For API errors or connection issues
     """
-    # Get API key from different sources in priority order
-    if not api_key:
-        try:
-            # First try to load from config file
-            api_key = load_api_key(config_file)
-        except FileNotFoundError:
-            # Fall back to environment variable
-            api_key = os.environ.get("GOOGLE_API_KEY")
-            if not api_key:
-                raise ValueError(
-                    "API key must be provided, set in a config file, or set as GOOGLE_API_KEY environment variable"
-                )
-    
-    # Configure the generative AI library
-    genai.configure(api_key=api_key)
-    
+    api_key = resolve_api_key(api_key, config_file)
+
     # Set up the model
     generation_config = {
         "temperature": temperature,
@@ -141,22 +282,240 @@ def prompt_gemini(
         "max_output_tokens": max_output_tokens,
     }
     
-    # Create model instance
-    model = genai.GenerativeModel(
-        model_name=model,
-        generation_config=generation_config,
-        safety_settings=safety_settings
-    )
+    # Reuse a cached model instance for this key and configuration
+    model = get_gemini_model(api_key, model, generation_config, safety_settings)
+    
+    request_options = _request_options(request_timeout)
+    if stream:
+        return _stream_response(model, prompt, resilience, request_options)
     
     try:
         # Send the prompt and get response
-        response = model.generate_content(prompt)
+        if resilience is not None:
+            response = resilience(model.generate_content, prompt, **request_options)
+        else:
+            response = model.generate_content(prompt, **request_options)
         
         # Return the text from the response
         return response.text
     except Exception as e:
         raise Exception(f"Error calling Gemini API: {str(e)}")
 
+def _request_options(timeout: Optional[float]) -> Dict[str, Any]:
+    """Keyword arguments giving a Gemini SDK request a timeout (none if `timeout` is None)."""
+    return {"request_options": {"timeout": timeout}} if timeout else {}
+
+def _stream_response(model: "genai.GenerativeModel", prompt: str,
+                     resilience: Optional[Callable[..., Any]] = None,
+                     request_options: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """
+    Yield the text of each response chunk as it arrives.
+    """
+    request_options = request_options or {}
+    try:
+        if resilience is not None:
+            response = resilience(model.generate_content, prompt, stream=True, **request_options)
+        else:
+            response = model.generate_content(prompt, stream=True, **request_options)
+        for chunk in response:
+            text = chunk.text
+            if text:
+                yield text
+    except Exception as e:
+        raise Exception(f"Error calling Gemini API: {str(e)}")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap, offline estimate of how many tokens `text` will use.
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most `max_tokens` (estimated) tokens.
+
+    Splits on sentence boundaries where possible and falls back to words
+    for sentences that are longer than the budget on their own.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    for sentence in re.split(r"(?<=[.!?])\s+", text.strip()):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+        else:
+            pieces.extend(sentence.split())
+
+    chunks = []
+    current = []
+    size = 0
+    for piece in pieces:
+        if current and size + len(piece) + 1 > max_chars:
+            chunks.append(" ".join(current))
+            current = []
+            size = 0
+        current.append(piece)
+        size += len(piece) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing request starts to at most `requests_per_minute`.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the caller may start its next request."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+def split_groups(texts: List[str], max_tokens: int) -> List[List[str]]:
+    """
+    Group consecutive texts so each group's combined size fits `max_tokens`.
+    """
+    groups = []
+    current = []
+    size = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and size + tokens > max_tokens:
+            groups.append(current)
+            current = []
+            size = 0
+        current.append(text)
+        size += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def _final_material(prior_summary: str, body: str) -> str:
+    """The text the final prompt summarizes: the prior summary (if any), then `body`."""
+    if prior_summary:
+        return f"Summary of earlier parts of the meeting:\n{prior_summary}\n\n{body}"
+    return body
+
+def summarize_transcript(
+    transcript: str,
+    instructions: str = "Generate a summary of everything discussed in the meeting.",
+    prior_summary: str = "",
+    chunk_tokens: int = 8000,
+    max_workers: int = 4,
+    requests_per_minute: float = 60,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    executor: Optional[Executor] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    **gemini_kwargs: Any
+) -> Dict[str, Any]:
+    """
+    Summarize an arbitrarily long transcript with parallel map-reduce.
+
+    The transcript is split into token-budgeted chunks that are summarized
+    concurrently on a bounded thread pool (map). Partial summaries are then
+    merged in token-budgeted groups, again concurrently, until they fit in
+    a single prompt (reduce). A final call applies `instructions`.
+    Short transcripts skip straight to the final call.
+
+    Args:
+        transcript (str): Transcript text to summarize.
+        instructions (str): What the final summary should look like.
+        prior_summary (str): Summary of earlier parts of the meeting, included in the final
+            prompt; if it does not fit there with the new material, it is merged in the reduce stage.
+        chunk_tokens (int): Input token budget for any single request.
+        max_workers (int): Maximum number of concurrent Gemini requests.
+        executor (Executor, optional): Shared worker pool to run the map and reduce
+            requests on (then `max_workers` is ignored).
+        requests_per_minute (float): Rate limit across all requests of this call (0 = unlimited).
+        rate_limiter (RateLimiter, optional): Shared limiter to draw on instead, so the
+            budget also covers concurrent summaries and other Gemini callers
+            (then `requests_per_minute` is ignored).
+        on_chunk (Callable[[str], None], optional): If given, the final summary is streamed
+            and each text chunk is passed to this callback as it arrives.
+        **gemini_kwargs: Passed through to prompt_gemini (api_key, model, temperature, ...).
+
+    Returns:
+        Dict[str, Any]: {"summary": str, "chunks": int, "reduce_levels": int,
+        "timings": {"map": float, "reduce": float, "final": float, "total": float}}
+    """
+    limiter = rate_limiter or RateLimiter(requests_per_minute)
+    timings = {"map": 0.0, "reduce": 0.0, "final": 0.0, "total": 0.0}
+    started = time.perf_counter()
+
+    def call(prompt: str) -> str:
+        limiter.acquire()
+        return prompt_gemini(prompt=prompt, **gemini_kwargs).strip()
+
+    # Each request's budget leaves room for its own prompt template. Only the
+    # final prompt carries the instructions and the prior summary.
+    map_budget = max(1, chunk_tokens - estimate_tokens(MAP_PROMPT))
+    merge_budget = max(1, chunk_tokens - estimate_tokens(MERGE_PROMPT))
+    final_budget = max(1, chunk_tokens - estimate_tokens(FINAL_PROMPT.format(instructions=instructions, text="")))
+    reduce_levels = 0
+
+    material = _final_material(prior_summary, f"Transcript:\n```{transcript}```")
+    if estimate_tokens(material) <= final_budget:
+        chunks = [transcript] if transcript.strip() else []
+    else:
+        chunks = split_into_chunks(transcript, map_budget) if transcript.strip() else []
+        with (nullcontext(executor) if executor else ThreadPoolExecutor(max_workers=max_workers)) as pool:
+            stage = time.perf_counter()
+            partials = list(pool.map(call, [MAP_PROMPT.format(text=c) for c in chunks]))
+            timings["map"] = time.perf_counter() - stage
+
+            stage = time.perf_counter()
+            prior = prior_summary
+            while True:
+                material = _final_material(prior, "Summaries of the meeting so far, in order:\n" +
+                                           "\n\n".join(partials))
+                if estimate_tokens(material) <= final_budget:
+                    break
+                if prior:
+                    # Too long together: the prior summary is merged like any other part
+                    partials = split_into_chunks(prior, merge_budget) + partials
+                    prior = ""
+                    continue
+                if len(partials) <= 1:
+                    break
+                # Parts too long to pair up are condensed on their own
+                size = estimate_tokens("\n\n".join(partials))
+                groups = split_groups(partials, merge_budget)
+                partials = list(pool.map(call, [MERGE_PROMPT.format(text="\n\n".join(g)) for g in groups]))
+                reduce_levels += 1
+                if estimate_tokens("\n\n".join(partials)) >= size:
+                    break  # Merging no longer shrinks the material
+            timings["reduce"] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    final_prompt = FINAL_PROMPT.format(instructions=instructions, text=material)
+    if on_chunk is None:
+        summary = call(final_prompt)
+    else:
+        limiter.acquire()
+        parts = []
+        for chunk in prompt_gemini(prompt=final_prompt, stream=True, **gemini_kwargs):
+            parts.append(chunk)
+            on_chunk(chunk)
+        summary = "".join(parts).strip()
+    timings["final"] = time.perf_counter() - stage
+    timings["total"] = time.perf_counter() - started
+
+    return {
+        "summary": summary,
+        "chunks": len(chunks),
+        "reduce_levels": reduce_levels,
+        "timings": timings,
+    }
+
 # Example usage
 if __name__ == "__main__":
     # Create a sample config.json file if you don't have one
@@ -0,0 +1,266 @@
+import os
+import time
+import wave
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+from Components.wake_word_component import normalize_text
+
+
+class KeywordHit(NamedTuple):
+    """One keyword spotted in the audio stream."""
+    word: str         # The wake word as configured
+    score: float      # Length-normalized DTW distance to the closest template (lower is closer)
+    threshold: float  # The word's detection threshold
+
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Triangular mel filters, shape (n_mels, n_fft // 2 + 1)."""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(20.0), hz_to_mel(rate / 2), n_mels + 2)
+    bins = np.fft.rfftfreq(n_fft, 1.0 / rate)
+    hz_points = mel_to_hz(mel_points)
+    lower, center, upper = hz_points[:-2, None], hz_points[1:-1, None], hz_points[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling))
+
+
+@lru_cache(maxsize=8)
+def _dct_matrix(n_mfcc: int, n_mels: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, shape (n_mfcc, n_mels)."""
+    k = np.arange(n_mfcc)[:, None]
+    n = np.arange(n_mels)[None, :]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    basis[0] /= np.sqrt(2.0)
+    return basis
+
+
+def _to_float(samples) -> np.ndarray:
+    """int16 PCM (bytes, memoryview or array) to float32 samples in [-1, 1]."""
+    if isinstance(samples, np.ndarray) and samples.dtype != np.int16:
+        return samples.astype(np.float32, copy=False)
+    return np.frombuffer(samples, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def mfcc(samples, rate: int, n_mfcc: int = 13, n_mels: int = 26,
+         frame_ms: float = 25.0, hop_ms: float = 10.0, n_fft: int = 512) -> np.ndarray:
+    """
+    Mel-frequency cepstral coefficients, computed for all frames at once.
+
+    Returns an array of shape (frames, n_mfcc); column 0 tracks overall
+    loudness.
+
+    Args:
+        samples: int16 PCM (bytes / memoryview / array) or float samples in [-1, 1].
+        rate (int): Sample rate in Hz.
+    """
+    x = _to_float(samples)
+    frame_len = int(rate * frame_ms / 1000)
+    hop = int(rate * hop_ms / 1000)
+    if len(x) < frame_len + 1:
+        return np.empty((0, n_mfcc), dtype=np.float32)
+
+    x = np.append(x[0], x[1:] - 0.97 * x[:-1])  # Pre-emphasis
+    frames = np.lib.stride_tricks.sliding_window_view(x, frame_len)[::hop] * np.hamming(frame_len)
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    log_mel = np.log(power @ _mel_filterbank(rate, n_fft, n_mels).T + 1e-10)
+    return (log_mel @ _dct_matrix(n_mfcc, n_mels).T).astype(np.float32)
+
+
+def keyword_features(samples, rate: int, loud_range: float = 12.0) -> np.ndarray:
+    """
+    MFCCs prepared for template matching: the loudness coefficient is
+    dropped and the mean over the loud frames (those within `loud_range`
+    of the loudest, in c0 units) is subtracted, so microphone and channel
+    differences cancel out without silence skewing the mean.
+    """
+    cepstra = mfcc(samples, rate)
+    if len(cepstra) == 0:
+        return cepstra[:, 1:]
+    loud = cepstra[:, 0] > cepstra[:, 0].max() - loud_range
+    features = cepstra[:, 1:]
+    return features - features[loud].mean(axis=0)
+
+
+def subsequence_dtw(template: np.ndarray, features: np.ndarray, from_frame: int = 0) -> Tuple[float, int]:
+    """
+    Best alignment of `template` against any stretch of `features` that
+    ends at or after frame `from_frame`.
+
+    Uses the slope-constrained step pattern (1,1), (1,2), (2,1), so each
+    template row depends only on earlier rows and the whole row is
+    computed in one vectorized step. Speaking rate may vary between half
+    and double the template's.
+
+    Returns:
+        Tuple[float, int]: Alignment cost divided by the template length,
+        and the feature frame where the best alignment ends (-1 if none does).
+    """
+    m, n = len(template), len(features)
+    from_frame = max(0, from_frame)
+    if m == 0 or n == 0 or from_frame >= n:
+        return float("inf"), -1
+    cost = np.sqrt(((template[:, None, :] - features[None, :, :]) ** 2).sum(axis=2))
+
+    previous2 = np.full(n, np.inf)
+    previous = cost[0].copy()  # An alignment may start at any frame
+    for i in range(1, m):
+        best = np.full(n, np.inf)
+        best[1:] = np.minimum(previous[:-1], previous2[:-1])
+        best[2:] = np.minimum(best[2:], previous[:-2])
+        previous2, previous = previous, cost[i] + best
+    end = from_frame + int(np.argmin(previous[from_frame:]))
+    return float(previous[end]) / m, end
+
+
+def trim_silence(samples: np.ndarray, rate: int, floor_db: float = -25.0) -> np.ndarray:
+    """Cut leading and trailing audio more than `floor_db` below the clip's peak level."""
+    frame = max(1, rate // 100)
+    count = len(samples) // frame
+    if count == 0:
+        return samples
+    rms = np.sqrt((samples[:count * frame].reshape(count, frame) ** 2).mean(axis=1) + 1e-12)
+    loud = np.flatnonzero(20 * np.log10(rms / rms.max()) > floor_db)
+    return samples[loud[0] * frame:(loud[-1] + 1) * frame]
+
+
+def load_wav(path: str, rate: int) -> np.ndarray:
+    """Read a 16-bit WAV file as mono float32 samples at `rate` Hz."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV files are supported")
+        channels = wav.getnchannels()
+        source_rate = wav.getframerate()
+        samples = _to_float(wav.readframes(wav.getnframes()))
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if source_rate != rate:
+        duration = len(samples) / source_rate
+        samples = np.interp(np.arange(0, duration, 1.0 / rate),
+                            np.arange(len(samples)) / source_rate, samples).astype(np.float32)
+    return samples
+
+
+def sample_directory(root: str, word: str) -> str:
+    """Directory holding the enrolled samples of `word` ("data lake 2.0" -> root/data_lake_2_point_0)."""
+    return os.path.join(root, normalize_text(word).replace(" ", "_"))
+
+
+class KeywordSpotter:
+    """
+    On-device keyword spotter working directly on captured PCM.
+
+    Each wake word is enrolled with a few recorded samples, stored as MFCC
+    templates. Incoming audio is kept in a short rolling buffer; after each
+    frame the buffer's MFCCs are aligned against every template with
+    subsequence DTW, and a word fires when an alignment ending in the
+    newest frame is closer than the word's threshold. No network or
+    transcription is involved, so a hit is reported within one frame of
+    the word being spoken.
+    """
+
+    def __init__(self, rate: int, margin: float = 1.2, default_threshold: float = 4.0,
+                 refractory_seconds: float = 2.0, min_level_db: float = -45.0):
+        """
+        Args:
+            rate (int): Sample rate of the audio passed to process().
+            margin (float): With two or more samples, a word's threshold is the
+                largest distance between its own samples times this margin.
+            default_threshold (float): Threshold for words with a single sample.
+            refractory_seconds (float): A word does not fire again within this time.
+            min_level_db (float): Frames quieter than this (dBFS) are not matched.
+        """
+        self.rate = rate
+        self.margin = margin
+        self.default_threshold = default_threshold
+        self.refractory_seconds = refractory_seconds
+        self.min_level_db = min_level_db
+
+        self._templates: Dict[str, List[np.ndarray]] = {}
+        self._thresholds: Dict[str, float] = {}
+        self._last_fired: Dict[str, float] = {}
+        self._buffer = np.empty(0, dtype=np.float32)
+        self._buffer_samples = 0
+
+    @property
+    def words(self) -> List[str]:
+        """Wake words that have at least one enrolled sample."""
+        return list(self._templates)
+
+    def enroll(self, word: str, samples: np.ndarray) -> None:
+        """Add one recorded sample of `word` (float samples at the spotter's rate)."""
+        features = keyword_features(trim_silence(samples, self.rate), self.rate)
+        if len(features) < 10:
+            raise ValueError(f"Sample for {word!r} is too short or silent")
+        self._templates.setdefault(word, []).append(features)
+        self._calibrate(word)
+
+        # Keep enough audio to hold the longest template spoken at half speed
+        longest = max(len(t) for ts in self._templates.values() for t in ts)
+        self._buffer_samples = int(longest * 2 * self.rate / 100)
+
+    def enroll_directory(self, words: Iterable[str], root: str) -> Dict[str, int]:
+        """
+        Enroll every WAV sample found for `words` under `root` (see
+        sample_directory). Returns the number of samples loaded per word.
+        """
+        loaded = {}
+        for word in words:
+            directory = sample_directory(root, word)
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if name.lower().endswith(".wav"):
+                    self.enroll(word, load_wav(os.path.join(directory, name), self.rate))
+                    loaded[word] = loaded.get(word, 0) + 1
+        return loaded
+
+    def _calibrate(self, word: str) -> None:
+        templates = self._templates[word]
+        if len(templates) < 2:
+            self._thresholds[word] = self.default_threshold
+            return
+        distances = [subsequence_dtw(a, b)[0]
+                     for i, a in enumerate(templates) for b in templates[i + 1:]]
+        self._thresholds[word] = max(distances) * self.margin
+
+    def process(self, pcm) -> List[KeywordHit]:
+        """
+        Feed the next frame of int16 PCM and return the keywords that ended in it.
+        """
+        if not self._templates:
+            return []
+        frame = _to_float(pcm)
+        self._buffer = np.concatenate((self._buffer, frame))[-self._buffer_samples:]
+
+        level = 10 * np.log10(np.mean(frame ** 2) + 1e-12)
+        if level < self.min_level_db:
+            return []
+
+        features = keyword_features(self._buffer, self.rate)
+        if len(features) == 0:
+            return []
+        # Only alignments ending in the newest frame count; older ones were already checked
+        newest = len(features) - max(1, len(frame) * 100 // self.rate) - 1
+
+        now = time.monotonic()
+        hits = []
+        for word, templates in self._templates.items():
+            if now - self._last_fired.get(word, -np.inf) < self.refractory_seconds:
+                continue
+            best = float("inf")
+            for template in templates:
+                best = min(best, subsequence_dtw(template, features, from_frame=newest)[0])
+            if best < self._thresholds[word]:
+                self._last_fired[word] = now
+                hits.append(KeywordHit(word, best, self._thresholds[word]))
+        return hits
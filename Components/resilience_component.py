@@ -0,0 +1,262 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """An external call did not finish within its deadline."""
+
+
+class CircuitOpenError(Exception):
+    """A call was rejected without being attempted because its circuit is open."""
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether retrying `error` can help.
+
+    Client errors reported by the provider SDKs (HTTP 4xx other than 408,
+    409 and 429: bad key, bad request, ...) will fail the same way again
+    and do not mean the provider is down. Everything else (timeouts,
+    connection errors, 5xx, rate limits) is treated as transient.
+    """
+    for attribute in ("status_code", "status", "code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int) and 400 <= status < 500:
+            return status in (408, 409, 429)
+    return not isinstance(error, (ValueError, TypeError, CircuitOpenError))
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a provider is down.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected immediately for `reset_seconds`. Then a single trial
+    call is let through (half-open): if it succeeds the circuit closes
+    again, otherwise it stays open for another `reset_seconds`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0,
+                 on_state_change: Optional[Callable[[str, str], None]] = None):
+        """
+        Args:
+            name (str): Provider name, used in errors and state-change reports.
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_seconds (float): How long the circuit stays open before a trial call.
+            on_state_change (Callable[[str, str], None], optional): Called with
+                (name, new state) whenever the state changes.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.on_state_change = on_state_change
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_running:
+                return False
+            self._trial_running = True  # Let exactly one trial call through
+            changed = self._set_state(self.HALF_OPEN)
+        self._notify(changed)
+        return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            changed = self._set_state(self.CLOSED)
+        self._notify(changed)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            changed = None
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                changed = self._set_state(self.OPEN)
+        self._notify(changed)
+
+    def _set_state(self, state: str) -> Optional[str]:
+        if state == self._state:
+            return None
+        self._state = state
+        return state
+
+    def _notify(self, state: Optional[str]) -> None:
+        if state and self.on_state_change:
+            try:
+                self.on_state_change(self.name, state)
+            except Exception as e:
+                print(f"Error reporting circuit state: {e}")
+
+
+class ResilientCall:
+    """
+    Deadline, retry, hedging and circuit-breaker policy for one external
+    dependency (a transcription API, an LLM, a telephony provider).
+
+    Each attempt runs on a small shared thread pool, so the caller stops
+    waiting when the attempt timeout or the overall deadline passes even if
+    the SDK call itself hangs. The abandoned request finishes (or times out
+    in the SDK) in the background. Transient failures are retried with
+    full-jitter exponential backoff while the deadline allows. With
+    `hedge_after`, an attempt still running after that many seconds gets a
+    duplicate request, and whichever answers first wins, which cuts tail
+    latency for idempotent calls. A CircuitBreaker rejects calls outright
+    while the provider keeps failing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        deadline: float = 30.0,
+        attempt_timeout: Optional[float] = None,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 5.0,
+        hedge_after: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        retry_if: Callable[[Exception], bool] = is_transient,
+        resend_if: Optional[Callable[[Exception], bool]] = None,
+        max_workers: int = 8,
+    ):
+        """
+        Args:
+            name (str): Dependency name, used in errors and stats.
+            deadline (float): Total time budget in seconds, across all attempts.
+            attempt_timeout (float, optional): Time budget of a single attempt
+                (defaults to whatever is left of the deadline).
+            retries (int): Extra attempts after a transient failure.
+            backoff (float): Upper bound of the first retry delay; doubles per retry.
+            max_backoff (float): Cap on the retry delay.
+            hedge_after (float, optional): Send a duplicate request if an attempt
+                is still running after this many seconds. Only for idempotent calls.
+            breaker (CircuitBreaker, optional): Circuit breaker for this dependency.
+            retry_if (Callable[[Exception], bool]): Decides whether an error is transient.
+            resend_if (Callable[[Exception], bool], optional): For calls that are not
+                idempotent: a transient failure is only retried if this says the
+                failed attempt surely had no effect. Other transient failures
+                still count against the circuit breaker.
+            max_workers (int): Threads available for attempts of this dependency.
+        """
+        self.name = name
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self.breaker = breaker
+        self.retry_if = retry_if
+        self.resend_if = resend_if
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+        self.counts = {"calls": 0, "failures": 0, "retries": 0, "timeouts": 0,
+                       "hedges": 0, "hedge_wins": 0, "rejected": 0}
+        self._counts_lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._counts_lock:
+            self.counts[key] += 1
+
+    def __call__(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call `fn(*args, **kwargs)` under this policy and return its result.
+        With hedging enabled `fn` may run more than once concurrently.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            DeadlineExceeded: If no attempt succeeded in time.
+            Exception: The last error, if it was not transient or retries ran out.
+        """
+        self._count("calls")
+        if self.breaker and not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open); not calling it")
+
+        deadline = time.monotonic() + self.deadline
+        for attempt in range(self.retries + 1):
+            remaining = deadline - time.monotonic()
+            timeout = min(remaining, self.attempt_timeout or remaining)
+            try:
+                result = self._attempt(fn, args, kwargs, timeout)
+            except Exception as e:
+                timed_out = isinstance(e, DeadlineExceeded)
+                retry = self.retry_if(e)
+                if not retry and not timed_out:
+                    if self.breaker:
+                        self.breaker.record_success()  # The provider answered; the request was bad
+                    raise
+                self._count("failures")
+                if self.breaker:
+                    self.breaker.record_failure()
+                    if self.breaker.state == CircuitBreaker.OPEN:
+                        raise
+                if self.resend_if is not None and not self.resend_if(e):
+                    raise
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                if not retry or attempt == self.retries or time.monotonic() + delay >= deadline:
+                    raise
+                self._count("retries")
+                time.sleep(delay)
+            else:
+                if self.breaker:
+                    self.breaker.record_success()
+                return result
+
+    def _attempt(self, fn: Callable[..., Any], args: tuple, kwargs: dict, timeout: float) -> Any:
+        started = time.monotonic()
+        end = started + timeout
+        futures = [self._executor.submit(fn, *args, **kwargs)]
+        while True:
+            now = time.monotonic()
+            wake = end
+            if self.hedge_after is not None and len(futures) == 1:
+                wake = min(wake, started + self.hedge_after)
+            wait([f for f in futures if not f.done()], timeout=max(0.0, wake - now),
+                 return_when=FIRST_COMPLETED)
+            for future in futures:
+                if future.done() and future.exception() is None:
+                    if future is not futures[0]:
+                        self._count("hedge_wins")
+                    return future.result()
+
+            if all(f.done() for f in futures):
+                raise futures[0].exception()
+            now = time.monotonic()
+            if now >= end:
+                self._count("timeouts")
+                raise DeadlineExceeded(f"{self.name} did not answer within {timeout:.1f}s")
+            if self.hedge_after is not None and len(futures) == 1 and now >= started + self.hedge_after:
+                self._count("hedges")
+                futures.append(self._executor.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counters plus the circuit state."""
+        with self._counts_lock:
+            stats = dict(self.counts)
+        stats["circuit"] = self.breaker.state if self.breaker else None
+        return stats
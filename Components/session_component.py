@@ -0,0 +1,219 @@
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from Components.audio_component import CaptureSource
+from Components.transcript_component import TranscriptStore
+from Components.wake_word_component import WakeWordMatcher
+
+
+class DetectionSession:
+    """
+    One monitored meeting room.
+
+    A session owns everything specific to that room: its capture sources
+    (one or more input devices or device channels), wake words (and their
+    compiled matcher), the number to call, the live transcript and its
+    trigger history. The detection pipeline runs on the session's own
+    threads, which only move audio around; transcription, summaries and
+    calls are handed to worker pools shared by all sessions.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        build_matcher: Callable[[List[str]], WakeWordMatcher],
+        name: Optional[str] = None,
+        sources: Iterable[CaptureSource] = (),
+        wake_words: Iterable[str] = (),
+        phone_number: str = "",
+        transcript_hot_segments: int = 500,
+        max_triggers: int = 100,
+    ):
+        """
+        Args:
+            session_id (str): Unique id, used in URLs and attached to the session's events.
+            build_matcher (Callable[[List[str]], WakeWordMatcher]): Compiles a wake-word list.
+            name (str, optional): Human-readable name (e.g. the room), used as the meeting title.
+            sources (Iterable[CaptureSource]): Devices / channels captured at the same
+                time; transcripts are tagged with each source's label.
+            wake_words (Iterable[str]): Words that trigger a call.
+            phone_number (str): Number called when a wake word is heard.
+            transcript_hot_segments (int): Transcript segments kept in memory.
+            max_triggers (int): Trigger records kept for /triggers.
+        """
+        self.id = session_id
+        self.name = name or session_id
+        self.sources = list(sources)
+        self.phone_number = phone_number
+        self.build_matcher = build_matcher
+        self.transcript_hot_segments = transcript_hot_segments
+        self.created = time.time()
+        self.set_wake_words(wake_words)
+
+        self.meeting_id: Optional[str] = None  # Archive id of the current (or last) run
+        self.started: Optional[float] = None
+        self.transcript = TranscriptStore(max_hot=transcript_hot_segments)
+        self.triggers = deque(maxlen=max_triggers)  # Outcome and latency of each action per trigger
+        self.last_trigger_time: Optional[float] = None
+        self.spotted_words = set()  # Wake words the keyword spotter handles; transcript matching skips them
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._active = False  # A run is in progress (cleared when its thread exits)
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def set_wake_words(self, words: Iterable[str]) -> None:
+        """Replace the wake words and recompile the matcher."""
+        self.wake_words = [w.strip() for w in words if w.strip()]
+        self.matcher = self.build_matcher(self.wake_words)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def stop_requested(self) -> bool:
+        """Checked by the pipeline loops between frames."""
+        return self._stop.is_set()
+
+    @property
+    def state(self) -> str:
+        if not self.running:
+            return "stopped"
+        return "stopping" if self.stop_requested else "running"
+
+    def start(self, target: Callable[["DetectionSession"], None]) -> bool:
+        """
+        Start a new run: fresh transcript and meeting id, then `target(self)`
+        on the session's thread. Returns False if the session is already running.
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self.transcript.close()
+            self.transcript = TranscriptStore(max_hot=self.transcript_hot_segments)
+            self.spotted_words = set()
+            self.meeting_id = uuid.uuid4().hex[:8]
+            self.started = time.time()
+            self._active = True
+            self._thread = threading.Thread(target=self._run, args=(target,), daemon=True,
+                                            name=f"session-{self.id}")
+            self._thread.start()
+            return True
+
+    def _run(self, target: Callable[["DetectionSession"], None]) -> None:
+        try:
+            target(self)
+        finally:
+            with self._lock:
+                self._active = False
+                closed = self._closed
+            if closed:
+                self.transcript.close()  # close() was called mid-run and left this to us
+
+    def stop(self) -> None:
+        """Ask the pipeline to stop; it finishes the windows in flight first."""
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def close(self) -> None:
+        """
+        Stop the session and release its transcript store, without waiting:
+        if a run is still finishing its windows in flight, the store is
+        released when the run's thread exits.
+        """
+        with self._lock:
+            self._closed = True
+            self.stop()
+            if self._active:
+                return
+        self.transcript.close()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Settings and status, as returned by the REST API."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "state": self.state,
+            "sources": [source.to_dict() for source in self.sources],
+            "wake_words": self.wake_words,
+            "phone_number": self.phone_number,
+            "created": self.created,
+            "started": self.started,
+            "meeting_id": self.meeting_id,
+            "segments": len(self.transcript),
+            "triggers": len(self.triggers),
+            "last_trigger_time": self.last_trigger_time,
+        }
+
+
+class SessionManager:
+    """
+    Registry of the detection sessions served by this process, capped at
+    `max_sessions` so the shared worker pools are never oversubscribed.
+    """
+
+    def __init__(self, build_matcher: Callable[[List[str]], WakeWordMatcher], max_sessions: int = 8,
+                 **session_defaults: Any):
+        """
+        Args:
+            build_matcher (Callable[[List[str]], WakeWordMatcher]): Compiles a wake-word list.
+            max_sessions (int): Maximum number of sessions, running or not.
+            **session_defaults: Default DetectionSession arguments (transcript_hot_segments, ...).
+        """
+        self.build_matcher = build_matcher
+        self.max_sessions = max_sessions
+        self.session_defaults = session_defaults
+        self._sessions: Dict[str, DetectionSession] = {}
+        self._lock = threading.Lock()
+
+    def create(self, **settings: Any) -> DetectionSession:
+        """
+        Create a session (name, sources, wake_words, phone_number).
+
+        Raises:
+            RuntimeError: If `max_sessions` sessions already exist.
+        """
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError(f"Session limit reached ({self.max_sessions})")
+            session_id = uuid.uuid4().hex[:8]
+            session = DetectionSession(session_id, self.build_matcher, **{**self.session_defaults, **settings})
+            self._sessions[session_id] = session
+            return session
+
+    def get(self, session_id: str) -> DetectionSession:
+        """
+        Raises:
+            KeyError: If there is no such session.
+        """
+        with self._lock:
+            return self._sessions[session_id]
+
+    def list(self) -> List[DetectionSession]:
+        """All sessions, oldest first."""
+        with self._lock:
+            return list(self._sessions.values())
+
+    def remove(self, session_id: str) -> DetectionSession:
+        """
+        Stop and forget a session. Returns at once; the session may still be
+        finishing its run (see DetectionSession.close).
+
+        Raises:
+            KeyError: If there is no such session.
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id)
+        session.close()
+        return session
+
+    def running(self) -> List[DetectionSession]:
+        return [s for s in self.list() if s.running]
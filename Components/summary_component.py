@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Tuple
+
+from Components.gemini_component import estimate_tokens
+
+FOLD_PROMPT = (
+    "You are maintaining a running summary of a meeting that is still in progress. "
+    "Update the summary so far with the new part of the transcript. Keep every decision, "
+    "question, action item and name that was mentioned, and keep it concise.\n\n"
+    "Summary so far:\n{summary}\n\n"
+    "New transcript:\n```{transcript}```\n\n"
+    "Updated summary:"
+)
+
+
+class RollingSummarizer:
+    """
+    Keeps a running summary of a meeting up to date in the background.
+
+    New transcript segments are queued with `add_segment`. Whenever one
+    arrives and `fold_every_segments` segments are pending, or
+    `fold_every_seconds` have passed since the last fold, a fold is
+    submitted to the shared `executor`, so many summarizers can share a few
+    workers. One fold sends at most `max_fold_tokens` of prompt; a longer
+    backlog (e.g. after Gemini was down) is folded in several steps. When a
+    summary is needed urgently, `snapshot` returns the cached summary plus
+    the tail that has not been folded in yet, so the final prompt stays
+    small no matter how long the meeting has been running.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str], str],
+        executor: Executor,
+        fold_every_segments: int = 12,
+        fold_every_seconds: float = 120.0,
+        max_fold_tokens: int = 8000,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        """
+        Args:
+            summarize (Callable[[str], str]): Sends a prompt to the LLM and returns its text.
+            executor (Executor): Shared pool the folds run on.
+            fold_every_segments (int): Fold once this many segments are pending.
+            fold_every_seconds (float): Fold pending segments at least this often.
+            max_fold_tokens (int): Input token budget of one fold prompt.
+            on_error (Callable[[Exception], None], optional): Called when a fold fails.
+        """
+        self.summarize = summarize
+        self.executor = executor
+        self.fold_every_segments = fold_every_segments
+        self.fold_every_seconds = fold_every_seconds
+        self.max_fold_tokens = max_fold_tokens
+        self.on_error = on_error
+
+        self.summary = ""
+        self._pending: List[str] = []
+        self._last_fold = time.monotonic()
+        self._retry_at = 0.0
+        self._stopped = False
+        self._folding = False
+        self._lock = threading.Lock()
+
+    def stop(self) -> None:
+        """Stop scheduling folds. Pending segments stay available via snapshot()."""
+        with self._lock:
+            self._stopped = True
+
+    def add_segment(self, text: str) -> None:
+        """Queue a new transcript segment to be folded into the summary."""
+        if not text:
+            return
+        with self._lock:
+            self._pending.append(text)
+        self._schedule()
+
+    def snapshot(self) -> Tuple[str, str]:
+        """
+        Return the cached summary and the transcript not yet folded into it.
+
+        Returns:
+            Tuple[str, str]: (summary so far, unsummarized tail text)
+        """
+        with self._lock:
+            return self.summary, " ".join(self._pending)
+
+    def _due(self) -> bool:
+        if not self._pending or time.monotonic() < self._retry_at:
+            return False
+        return (len(self._pending) >= self.fold_every_segments
+                or time.monotonic() - self._last_fold >= self.fold_every_seconds)
+
+    def _schedule(self) -> None:
+        with self._lock:
+            submit = not self._stopped and not self._folding and self._due()
+            if submit:
+                self._folding = True
+        if submit:
+            self.executor.submit(self._pooled_fold)
+
+    def _pooled_fold(self) -> None:
+        try:
+            self._fold()
+        finally:
+            with self._lock:
+                self._folding = False
+        self._schedule()  # Fold the rest of a backlog that did not fit in one prompt
+
+    def _fold(self) -> None:
+        with self._lock:
+            summary = self.summary
+            # Oldest segments first, as many as fit next to the summary (at least one)
+            budget = self.max_fold_tokens - estimate_tokens(FOLD_PROMPT + summary)
+            batch = []
+            for text in self._pending:
+                budget -= estimate_tokens(text)
+                if batch and budget < 0:
+                    break
+                batch.append(text)
+
+        try:
+            updated = self.summarize(FOLD_PROMPT.format(
+                summary=summary or "(nothing yet)",
+                transcript=" ".join(batch),
+            )).strip()
+        except Exception as e:
+            with self._lock:
+                self._retry_at = time.monotonic() + self.fold_every_seconds  # Back off
+            if self.on_error:
+                self.on_error(e)
+            return
+
+        with self._lock:
+            # Segments added while the fold was running stay pending
+            self.summary = updated
+            del self._pending[:len(batch)]
+            self._last_fold = time.monotonic()
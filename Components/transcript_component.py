@@ -0,0 +1,218 @@
+import bisect
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from typing import List, Optional, Tuple
+
+_WORD_RE = re.compile(r"\S+")
+_STRIP_RE = re.compile(r"[^\w]+")
+
+
+def _norm(word: str) -> str:
+    """Lowercase a word and drop punctuation for overlap comparison."""
+    return _STRIP_RE.sub("", word.lower())
+
+
+def _longest_overlap(prev: List[str], cur: List[str], max_words: int, min_words: int) -> int:
+    """Length of the longest suffix of `prev` that is also a prefix of `cur`."""
+    for k in range(min(max_words, len(prev), len(cur)), min_words - 1, -1):
+        if prev[-k:] == cur[:k]:
+            return k
+    return 0
+
+
+def stitch_overlap(previous: str, current: str, max_overlap_words: int = 20) -> str:
+    """
+    Remove the words at the start of `current` that repeat the end of `previous`.
+
+    Used with overlapping analysis windows: the audio both windows share gets
+    transcribed twice, so the duplicated words are dropped before the new
+    text is appended to the transcript. Words cut off at a window edge are
+    tolerated: the last word of `previous` and the first word of `current`
+    may be fragments and are allowed to not match.
+
+    Args:
+        previous (str): Text already committed to the transcript.
+        current (str): Transcription of the new, overlapping window.
+        max_overlap_words (int): Longest duplicated run to look for.
+
+    Returns:
+        str: `current` with the duplicated prefix removed.
+    """
+    cur_words = _WORD_RE.findall(current)
+    if not previous or not cur_words:
+        return current.strip()
+
+    prev_norm = [_norm(w) for w in _WORD_RE.findall(previous)[-(max_overlap_words + 1):]]
+    cur_norm = [_norm(w) for w in cur_words[:max_overlap_words + 1]]
+
+    best_end = 0
+    best_len = 0
+    for trim_prev, skip_cur in ((0, 0), (1, 0), (0, 1), (1, 1)):
+        # A lone matching word is only trusted when no edge fragment is skipped
+        min_words = 1 if trim_prev == skip_cur == 0 else 2
+        k = _longest_overlap(prev_norm[:len(prev_norm) - trim_prev], cur_norm[skip_cur:],
+                             max_overlap_words, min_words)
+        if k > best_len:
+            best_len = k
+            best_end = skip_cur + k
+
+    return " ".join(cur_words[best_end:])
+
+
+def boundary_region(previous: str, current: str, context_words: int = 8) -> Tuple[str, int]:
+    """
+    Join the tail of `previous` with `current` so phrases spanning a window
+    boundary can be matched.
+
+    Returns:
+        Tuple[str, int]: The joined text and the offset at which `current`
+        starts inside it. Matches ending at or before that offset were
+        already seen in an earlier window.
+    """
+    tail = " ".join(_WORD_RE.findall(previous)[-context_words:]) if context_words else ""
+    if not tail:
+        return current, 0
+    return f"{tail} {current}", len(tail) + 1
+
+
+class Segment:
+    """One finalized piece of the transcript."""
+
+    __slots__ = ("start", "end", "text", "confidence", "window_id", "source")
+
+    def __init__(self, start: float, end: float, text: str,
+                 confidence: Optional[float] = None, window_id: Optional[int] = None,
+                 source: Optional[str] = None):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.confidence = confidence
+        self.window_id = window_id
+        self.source = source  # Label of the capture source the text was heard on
+
+    def to_dict(self) -> dict:
+        return {
+            "start": self.start,
+            "end": self.end,
+            "text": self.text,
+            "confidence": self.confidence,
+            "window_id": self.window_id,
+            "source": self.source,
+        }
+
+    def __repr__(self) -> str:
+        return f"Segment({self.start:.1f}-{self.end:.1f}, {self.text!r})"
+
+
+class TranscriptStore:
+    """
+    Time-indexed transcript with a bounded in-memory tail.
+
+    The newest `max_hot` segments are kept in memory, ordered by start time
+    and searched with bisect. Older segments are spilled in batches to an
+    append-only SQLite table indexed on start time, so all-day sessions use
+    bounded memory and time-range queries stay O(log n) on both tiers.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_hot: int = 500, spill_batch: int = 100):
+        """
+        Args:
+            path (str, optional): SQLite file for spilled segments, created on
+                first spill. If None, a temporary file is used and removed
+                again by close().
+            max_hot (int): Segments kept in memory.
+            spill_batch (int): Segments moved to disk at a time once `max_hot` is exceeded.
+        """
+        self.path = path
+        self.max_hot = max_hot
+        self.spill_batch = max(1, min(spill_batch, max_hot))
+        self._starts: List[float] = []
+        self._hot: List[Segment] = []
+        self._cold_count = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._temp_path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._cold_count + len(self._hot)
+
+    def append(self, text: str, start: float, end: float,
+               confidence: Optional[float] = None, window_id: Optional[int] = None,
+               source: Optional[str] = None) -> Segment:
+        """Add a segment. Segments are expected in (roughly) increasing start order."""
+        segment = Segment(start, end, text, confidence, window_id, source)
+        with self._lock:
+            index = bisect.bisect_right(self._starts, start)
+            self._starts.insert(index, start)
+            self._hot.insert(index, segment)
+            if len(self._hot) > self.max_hot:
+                self._spill()
+        return segment
+
+    def range(self, start: float = -math.inf, end: float = math.inf,
+              source: Optional[str] = None) -> List[Segment]:
+        """Segments starting in [start, end), oldest first; only those from `source` if given."""
+        with self._lock:
+            segments = []
+            if self._cold_count and (not self._starts or start < self._starts[0]):
+                segments = self._cold_range(start, end)
+            lo = bisect.bisect_left(self._starts, start)
+            hi = bisect.bisect_left(self._starts, end)
+            segments += self._hot[lo:hi]
+        if source is not None:
+            segments = [s for s in segments if s.source == source]
+        return segments
+
+    def close(self) -> None:
+        """Close the spill database (and delete it if it was a temporary file)."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            if self._temp_path:
+                os.remove(self._temp_path)
+                self._temp_path = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            path = self.path
+            if path:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            else:
+                fd, path = tempfile.mkstemp(prefix="transcript_", suffix=".sqlite")
+                os.close(fd)
+                self._temp_path = path
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "start_time REAL NOT NULL, end_time REAL NOT NULL, text TEXT NOT NULL, "
+                "confidence REAL, window_id INTEGER, source TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS segments_start ON segments (start_time)")
+        return self._db
+
+    def _spill(self) -> None:
+        batch = self._hot[:self.spill_batch]
+        db = self._connect()
+        with db:
+            db.executemany(
+                "INSERT INTO segments (start_time, end_time, text, confidence, window_id, source) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(s.start, s.end, s.text, s.confidence, s.window_id, s.source) for s in batch],
+            )
+        del self._hot[:len(batch)]
+        del self._starts[:len(batch)]
+        self._cold_count += len(batch)
+
+    def _cold_range(self, start: float, end: float) -> List[Segment]:
+        rows = self._connect().execute(
+            "SELECT start_time, end_time, text, confidence, window_id, source FROM segments "
+            "WHERE start_time >= ? AND start_time < ? ORDER BY start_time",
+            (max(start, -1e308), min(end, 1e308)),
+        )
+        return [Segment(*row) for row in rows]
@@ -0,0 +1,89 @@
+import numpy as np
+
+
+class VoiceActivityGate:
+    """
+    Energy / zero-crossing voice activity gate for int16 PCM windows.
+
+    Each window is split into short frames; a frame counts as speech when it
+    is louder than `energy_threshold_db` and its zero-crossing rate is below
+    `zcr_max` (broadband hiss crosses zero far more often than voiced
+    speech). A window is uploaded when enough of its frames are speech, and
+    for `hangover_windows` windows afterwards so trailing words are not cut.
+    """
+
+    def __init__(
+        self,
+        rate: int = 16000,
+        frame_ms: int = 30,
+        energy_threshold_db: float = -45.0,
+        zcr_max: float = 0.35,
+        min_speech_ratio: float = 0.05,
+        hangover_windows: int = 1,
+    ):
+        """
+        Args:
+            rate (int): Sample rate in Hz.
+            frame_ms (int): Analysis frame length in milliseconds.
+            energy_threshold_db (float): Frame RMS level (dBFS) above which a frame may be speech.
+            zcr_max (float): Maximum zero-crossing rate (crossings per sample) of a speech frame.
+            min_speech_ratio (float): Fraction of speech frames needed to call a window speech.
+            hangover_windows (int): Windows still uploaded after the last speech window.
+        """
+        self.rate = rate
+        self.frame_len = max(1, rate * frame_ms // 1000)
+        self.energy_threshold_db = energy_threshold_db
+        self.zcr_max = zcr_max
+        self.min_speech_ratio = min_speech_ratio
+        self.hangover_windows = hangover_windows
+        self._hangover = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zero the per-session counters."""
+        self.windows_seen = 0
+        self.windows_uploaded = 0
+        self.windows_skipped = 0
+        self.seconds_skipped = 0.0
+
+    def speech_ratio(self, pcm) -> float:
+        """
+        Fraction of frames in `pcm` (int16 bytes or buffer) classified as speech.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n_frames = len(samples) // self.frame_len
+        if n_frames == 0:
+            return 0.0
+        frames = samples[:n_frames * self.frame_len].reshape(n_frames, self.frame_len).astype(np.float32)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energy_db = 20.0 * np.log10(np.maximum(rms, 1e-9) / 32768.0)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1 or 1)
+
+        speech = (energy_db > self.energy_threshold_db) & (zcr < self.zcr_max)
+        return float(np.count_nonzero(speech)) / n_frames
+
+    def should_upload(self, pcm) -> bool:
+        """
+        Decide whether a window is worth transcribing and update the counters.
+        """
+        self.windows_seen += 1
+        if self.speech_ratio(pcm) >= self.min_speech_ratio:
+            self._hangover = self.hangover_windows
+            self.windows_uploaded += 1
+            return True
+        if self._hangover > 0:
+            self._hangover -= 1
+            self.windows_uploaded += 1
+            return True
+
+        self.windows_skipped += 1
+        self.seconds_skipped += len(pcm) / 2 / self.rate
+        return False
+
+    def summary(self) -> str:
+        """Human-readable counters for the session log."""
+        return (f"VAD: {self.windows_skipped} of {self.windows_seen} windows were silent and not uploaded "
+                f"({self.seconds_skipped:.0f}s of audio)")
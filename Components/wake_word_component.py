@@ -0,0 +1,256 @@
+import re
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+_UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+_DECIMAL_RE = re.compile(r"(?<=\d)[.,](?=\d)")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SOUNDEX_CODES = {c: d for d, letters in {
+    "1": "bfpv", "2": "cgjkqsxz", "3": "dt", "4": "l", "5": "mn", "6": "r",
+}.items() for c in letters}
+
+
+class WakeWordHit(NamedTuple):
+    """One wake-word occurrence. Offsets index into the normalized text."""
+    word: str        # The wake word as configured
+    start: int
+    end: int
+    matched: str     # The normalized text that matched
+    distance: int    # 0 for exact matches, edit distance for fuzzy ones
+
+
+def _is_number(token: str) -> bool:
+    return token.isdigit()
+
+
+def _anchors(phrase: str) -> FrozenSet[int]:
+    """
+    Indices into the space-free `phrase` that fuzzy matching must keep as
+    they are: the first letter of every word and every digit.
+    """
+    anchors = set()
+    offset = 0
+    for token in phrase.split():
+        anchors.update(range(offset, offset + len(token)) if _is_number(token) else (offset,))
+        offset += len(token)
+    return frozenset(anchors)
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """
+    Normalize text into comparable tokens.
+
+    Lowercases, strips diacritics and punctuation, and rewrites spoken
+    numbers so ASR variants line up: "Data Lake two point oh",
+    "data-lake 2.0" and "data lake 2 point 0" all become
+    ["data", "lake", "2", "point", "0"].
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = _DECIMAL_RE.sub(" point ", text)
+    raw = _TOKEN_RE.findall(text)
+
+    tokens: List[str] = []
+    i = 0
+    while i < len(raw):
+        token = raw[i]
+        if token in _TENS:
+            value = _TENS[token]
+            if i + 1 < len(raw) and raw[i + 1] in _UNITS and _UNITS[raw[i + 1]] < 10:
+                value += _UNITS[raw[i + 1]]
+                i += 1
+            tokens.append(str(value))
+        elif token in _UNITS:
+            tokens.append(str(_UNITS[token]))
+        elif token in ("oh", "o") and tokens and (tokens[-1] == "point" or _is_number(tokens[-1])):
+            tokens.append("0")
+        elif token == "dot" and tokens and _is_number(tokens[-1]):
+            tokens.append("point")
+        else:
+            tokens.append(token)
+        i += 1
+    return tokens
+
+
+def normalize_text(text: str) -> str:
+    """Normalized form of `text` as a single space-separated string."""
+    return " ".join(normalize_tokens(text))
+
+
+def soundex(word: str) -> str:
+    """Classic four-character Soundex key, used for optional phonetic matching."""
+    letters = [c for c in word.lower() if c.isalpha()]
+    if not letters:
+        return ""
+    key = letters[0].upper()
+    last = _SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        code = _SOUNDEX_CODES.get(c, "")
+        if code and code != last:
+            key += code
+            if len(key) == 4:
+                break
+        if c not in "hw":
+            last = code
+    return key.ljust(4, "0")
+
+
+def bounded_edit_distance(a: str, b: str, bound: int, anchors: FrozenSet[int] = frozenset()) -> Optional[int]:
+    """
+    Levenshtein distance between `a` and `b`, or None if it exceeds `bound`.
+
+    Characters of `b` whose index is in `anchors` may not be substituted or
+    deleted; they must appear in `a` as they are. Stops as soon as every
+    entry of a DP row is over the bound, so comparing against clearly
+    different words is cheap.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return None
+    unreachable = bound + 1
+    previous = [0]
+    for j in range(1, len(b) + 1):
+        previous.append(unreachable if j - 1 in anchors else min(previous[-1] + 1, unreachable))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            if j - 1 in anchors:
+                cost = min(previous[j] + 1, previous[j - 1] if ca == cb else unreachable)
+            else:
+                cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(min(cost, unreachable))
+        if min(current) > bound:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= bound else None
+
+
+class WakeWordMatcher:
+    """
+    Multi-pattern wake-word matcher compiled once per wake-word list.
+
+    All wake words are normalized and folded into a single regular
+    expression, so one scan of the (normalized) transcript finds every
+    exact hit regardless of how many wake words are configured. Optional
+    fuzzy matching then catches near misses ("mohammed" vs "mohammad",
+    "datalake" vs "data lake") within a bounded edit distance, and
+    optional Soundex matching catches single-word names spelled by sound.
+
+    Fuzzy matches never edit the first letter of a word or any part of a
+    number, and never drop a number: "austin" is not "justin", and
+    "data lake 3.0" is not "data lake 2.0".
+    """
+
+    def __init__(self, wake_words: Iterable[str], max_edits: int = 0, phonetic: bool = False,
+                 min_fuzzy_length: int = 5):
+        """
+        Args:
+            wake_words (Iterable[str]): Wake words / phrases as configured by the user.
+            max_edits (int): Maximum edit distance for fuzzy matches (0 disables fuzzy matching).
+            phonetic (bool): Also match single-word wake words by Soundex key.
+            min_fuzzy_length (int): Phrases shorter than this are only matched exactly.
+        """
+        self.max_edits = max_edits
+        self.phonetic = phonetic
+        self.min_fuzzy_length = min_fuzzy_length
+
+        self._phrases: Dict[str, str] = {}
+        for word in wake_words:
+            normalized = normalize_text(word)
+            if normalized and normalized not in self._phrases:
+                self._phrases[normalized] = word
+
+        # Longest phrases first so "data lake 2 point 0" wins over "data lake"
+        alternatives = sorted(self._phrases, key=len, reverse=True)
+        self._pattern = (
+            re.compile(r"(?<!\S)(?:" + "|".join(re.escape(a) for a in alternatives) + r")(?!\S)")
+            if alternatives else None
+        )
+        self._fuzzy = [
+            (phrase, phrase.replace(" ", ""), phrase.count(" ") + 1, _anchors(phrase),
+             [t for t in phrase.split() if _is_number(t)],
+             soundex(phrase) if phonetic and " " not in phrase else None)
+            for phrase in alternatives if len(phrase.replace(" ", "")) >= min_fuzzy_length
+        ]
+
+    @property
+    def wake_words(self) -> List[str]:
+        """The configured wake words this matcher was built from."""
+        return list(self._phrases.values())
+
+    def find_all(self, text: str) -> List[WakeWordHit]:
+        """Normalize `text` and return every wake-word hit in it."""
+        return self.find_all_normalized(normalize_text(text))
+
+    def find_all_normalized(self, text: str) -> List[WakeWordHit]:
+        """
+        Return every wake-word hit in already-normalized `text`, ordered by offset.
+        """
+        if self._pattern is None or not text:
+            return []
+        hits = [
+            WakeWordHit(self._phrases[m.group()], m.start(), m.end(), m.group(), 0)
+            for m in self._pattern.finditer(text)
+        ]
+        if self.max_edits > 0 or self.phonetic:
+            hits.extend(self._fuzzy_hits(text, hits))
+            hits.sort(key=lambda h: h.start)
+        return hits
+
+    def _fuzzy_hits(self, text: str, exact: List[WakeWordHit]) -> List[WakeWordHit]:
+        spans = [(m.start(), m.end(), m.group()) for m in re.finditer(r"\S+", text)]
+        taken = [(h.start, h.end) for h in exact]
+        found = []
+
+        for phrase, compact, n_tokens, anchors, numbers, phrase_key in self._fuzzy:
+            bound = min(self.max_edits, len(compact) // 4)
+            # Compare against runs of n and n-1 tokens with spaces removed, so
+            # words the ASR merged ("datalake") still line up. Runs of n+1 are
+            # not tried: "just in" is far more often meant than "justin".
+            for size in range(max(1, n_tokens - 1), n_tokens + 1):
+                for i in range(len(spans) - size + 1):
+                    start, end = spans[i][0], spans[i + size - 1][1]
+                    if any(start < t_end and end > t_start for t_start, t_end in taken):
+                        continue
+                    # Numbers must all be there, unchanged; a shorter run may
+                    # only merge words, never drop a version number
+                    if [s[2] for s in spans[i:i + size] if _is_number(s[2])] != numbers:
+                        continue
+                    candidate = "".join(s[2] for s in spans[i:i + size])
+                    distance = bounded_edit_distance(candidate, compact, bound, anchors) if bound else None
+                    if distance is None and phrase_key and size == 1 and len(candidate) >= 4:
+                        if soundex(candidate) == phrase_key:
+                            distance = bounded_edit_distance(candidate, compact, max(len(candidate), len(compact)))
+                    if distance is None:
+                        continue
+                    found.append(WakeWordHit(self._phrases[phrase], start, end, text[start:end], distance))
+                    taken.append((start, end))
+        return found
+
+
+if __name__ == "__main__":
+    # Regression checks: run `python Components/wake_word_component.py`
+    words = ["justin", "mohammad", "data lake 2.0"]
+    exact = WakeWordMatcher(words)
+    fuzzy = WakeWordMatcher(words, max_edits=1)
+
+    for matcher in (exact, fuzzy):
+        assert [h.word for h in matcher.find_all("Hey Justin, data lake two point oh is live")] == \
+            ["justin", "data lake 2.0"]
+    assert [h.word for h in fuzzy.find_all("ask mohammed about the datalake 2.0 rollout")] == \
+        ["mohammad", "data lake 2.0"]
+
+    for text in ("data lake 3.0", "data lake 2.1 is out", "data make 2.0", "datalake 2 point",
+                 "our austin office", "dustin said"):
+        for matcher in (exact, fuzzy):
+            hits = matcher.find_all(text)
+            assert not hits, f"{text!r} should not match, got {hits}"
+    print("wake_word_component: all checks passed")
@@ -7,50 +7,198 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 load_dotenv()
 
-import openai
 import pyaudio
-import wave
+import copy
+import importlib
+import io
+import itertools
 import time
 import threading
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, abort, render_template, request, redirect, url_for, jsonify
 
-from Components.call_component import make_phone_call
-from Components.gemini_component import prompt_gemini
+from Components.archive_component import MeetingArchive
+from Components.asr_component import BACKENDS as ASR_BACKENDS, TranscriptionQueue, create_backend
+from Components.audio_component import (CaptureSource, CaptureStream, UploadEncoder, WindowReader, WavWindowBuffer,
+                                       list_input_devices)
+from Components.event_component import EventLog
+from Components.kws_component import KeywordSpotter, load_wav, sample_directory
+from Components.resilience_component import CircuitBreaker, ResilientCall
+from Components.session_component import SessionManager
+from Components.call_component import NotificationDispatcher, call_was_not_placed, clear_twilio_clients
+from Components.summary_component import RollingSummarizer
+from Components.transcript_component import stitch_overlap, boundary_region
+from Components.vad_component import VoiceActivityGate
+from Components.wake_word_component import WakeWordMatcher, normalize_text
+from Components.gemini_component import (prompt_gemini, summarize_transcript, invalidate_gemini_clients,
+                                         warm_up_gemini, RateLimiter)
 
 ########################
 # CONFIG
 ########################
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 CHUNK = 1024
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000
 RECORD_SECONDS = 5
+WINDOW_OVERLAP_SECONDS = 1.0  # Audio shared by consecutive windows (0 disables overlap)
+WINDOW_HOP_SECONDS = RECORD_SECONDS - WINDOW_OVERLAP_SECONDS
+BOUNDARY_CONTEXT_WORDS = 8    # Words of the previous window kept for wake-word matching
+WAKE_WORD_MAX_EDITS = 0       # Edit distance tolerated for ASR misspellings (0 = exact only)
+WAKE_WORD_PHONETIC = False    # Also match single-word names by Soundex key
+CAPTURE_BUFFER_SECONDS = 60  # Audio kept in the ring buffer while ASR catches up
+EVENT_BUFFER_SIZE = 1000     # Events kept in memory for the dashboard
+TRANSCRIPT_HOT_SEGMENTS = 500  # Transcript segments kept in memory; older ones spill to disk
+
+# Searchable archive of every meeting (transcripts, summaries, triggers)
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "meetings.sqlite"))
+ARCHIVE_BATCH_SIZE = 100     # Writes committed per transaction
+ARCHIVE_FLUSH_SECONDS = 2.0  # Maximum delay before a write is committed
+
+# Speech recognition: "openai" (Whisper API), or "faster_whisper" / "vosk" to run locally and offline
+ASR_BACKEND = os.getenv("ASR_BACKEND", "openai")
+ASR_MODEL = os.getenv("ASR_MODEL", "")  # Model size or path for local backends (e.g. "tiny.en", a Vosk model dir)
+STREAMING_ASR = os.getenv("STREAMING_ASR", "").lower() in ("1", "true", "yes")  # Match on partial results (vosk only)
+STREAM_FRAME_SECONDS = 0.25  # Audio fed to the streaming recognizer at a time
+ASR_MAX_IN_FLIGHT = 4        # Windows transcribed concurrently (pooled keep-alive connections for the API)
+ASR_STATS_EVERY = 12         # Publish throughput / backpressure stats every N windows
+ASR_WORKERS = max(ASR_MAX_IN_FLIGHT, os.cpu_count() or 1)  # Windows transcribed at once across all sessions
+# Uploaded windows are compressed: "ogg" (Vorbis, ~6x smaller), "opus" (smaller, slower to encode),
+# "flac" (lossless) or "wav" (off). Falls back to flac, then wav, if the codec is unavailable.
+UPLOAD_CODEC = os.getenv("UPLOAD_CODEC", "ogg")
+UPLOAD_COMPRESSION_LEVEL = None  # 0 (fastest) to 1 (smallest); None uses the codec default
+
+# On-device keyword spotting: wake words with enrolled samples fire straight from the audio,
+# without waiting for transcription (samples live in KWS_SAMPLES_DIR/<wake_word>/*.wav)
+KWS_ENABLED = True
+KWS_SAMPLES_DIR = os.getenv("KWS_SAMPLES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "keywords"))
+KWS_FRAME_SECONDS = 0.2  # Audio matched against the templates at a time
+
+# Voice activity gate: silent windows are not sent to Whisper
+VAD_ENABLED = True
+VAD_ENERGY_THRESHOLD_DB = -45.0  # Frame level (dBFS) that may count as speech
+VAD_ZCR_MAX = 0.35               # Zero-crossings per sample above which a frame is noise
+VAD_MIN_SPEECH_RATIO = 0.05      # Fraction of speech frames needed to upload a window
+VAD_HANGOVER_WINDOWS = 1         # Windows still uploaded after speech stops
+VAD_STREAM_HANGOVER_SECONDS = 1.0  # Streaming mode: audio still fed to the recognizer after speech stops
+
+# Phone notifications
+CALL_COOLDOWN_SECONDS = 60   # Don't call the same number again within this time
+
+# Trigger handling: call and summary run concurrently on this many workers
+TRIGGER_WORKERS = 4
+
+# Rolling meeting summary, refreshed in the background
+SUMMARY_FOLD_SEGMENTS = 12   # Fold new transcript into the summary every N segments...
+SUMMARY_FOLD_SECONDS = 120   # ...or at least this often
+SUMMARY_CHUNK_TOKENS = 8000  # Input token budget per Gemini request
+SUMMARY_MAX_WORKERS = 4      # Concurrent Gemini requests for folds and split transcripts, across all sessions
+SUMMARY_REQUESTS_PER_MINUTE = 60  # Shared by every Gemini request: summaries and folds, all sessions
+
+# Sessions: every monitored room runs its own pipeline on the shared worker pools
+MAX_SESSIONS = 8
+
+# Timeouts, retries and circuit breakers for external APIs
+WHISPER_DEADLINE_SECONDS = 20   # Total budget per window, retries included
+WHISPER_ATTEMPT_SECONDS = 8     # Budget per upload attempt
+WHISPER_HEDGE_SECONDS = 4       # Send a duplicate upload if the first is this slow (None disables)
+WHISPER_RETRIES = 2
+GEMINI_DEADLINE_SECONDS = 60
+GEMINI_ATTEMPT_SECONDS = 30
+GEMINI_RETRIES = 2
+TWILIO_DEADLINE_SECONDS = 15    # Calls are never hedged or retried after a timeout (no duplicate calls)
+TWILIO_RETRIES = 1
+CIRCUIT_FAILURE_THRESHOLD = 5   # Consecutive failures before a provider is skipped...
+CIRCUIT_RESET_SECONDS = 30      # ...for this long, then probed with a single request
+
+# Debug mode: set DEBUG_AUDIO_DIR to also write every window to disk as a WAV
+DEBUG_AUDIO_DIR = os.getenv("DEBUG_AUDIO_DIR", "")
+
+# Startup: slow SDKs are imported on a background thread once the server is up
+WARM_UP_IMPORTS = ("google.generativeai", "twilio.rest", "openai", "httpx")
+
+# PyAudio is initialized (and the devices scanned) on first use, not at import
+audio = None
+audio_lock = threading.Lock()
+default_device_index = None  # Set when PyAudio is initialized
+
+# Shared data for logs, settings, etc.
+DEFAULT_WAKE_WORDS = ["justin", "mohammad", "data lake 2.0"]
+events = EventLog(capacity=EVENT_BUFFER_SIZE)  # Bounded, typed event stream (logs included)
+trigger_ids = itertools.count(1)
+asr_backend_name = ASR_BACKEND if ASR_BACKEND in ASR_BACKENDS else "openai"
+asr_backend = None  # Created on first use and reused for every window
+asr_backend_lock = threading.RLock()
+asr_backend_users = {}  # Backend -> windows and runs using it; a replaced backend is closed when this drops to 0
+archive = MeetingArchive(ARCHIVE_PATH, batch_size=ARCHIVE_BATCH_SIZE, flush_seconds=ARCHIVE_FLUSH_SECONDS)
+
+def build_wake_word_matcher(words):
+    """
+    Compile the wake-word list into a matcher. Called once per settings change.
+    """
+    return WakeWordMatcher(words, max_edits=WAKE_WORD_MAX_EDITS, phonetic=WAKE_WORD_PHONETIC)
+
+# Each session owns its device, wake words, recipient and transcript; the
+# dashboard's settings form controls the default session
+sessions = SessionManager(build_wake_word_matcher, max_sessions=MAX_SESSIONS,
+                          transcript_hot_segments=TRANSCRIPT_HOT_SEGMENTS)
+def get_audio():
+    """
+    Return the shared PyAudio instance, initializing PyAudio and picking
+    the default input device on first use.
+    """
+    global audio, default_device_index
+    with audio_lock:
+        if audio is None:
+            instance = pyaudio.PyAudio()
+
+            # Automatically find the BlackHole device index
+            device_index = None
+            for i in range(instance.get_device_count()):
+                info = instance.get_device_info_by_index(i)
+                if "BlackHole 2ch" in info['name']:
+                    device_index = i
+                    break
+
+            # Fallback to default device if BlackHole not found
+            if device_index is None:
+                print("Warning: BlackHole 2ch device not found. Using default device.")
+                device_index = 2  # Keeping original default as fallback
+            default_device_index = device_index
+            audio = instance
+        return audio
+
+def build_source(device_index, channel=None, label=None):
+    """
+    Describe one capture source, checking that the device can record (on
+    that channel). The label defaults to the device name, plus the channel.
+
+    Raises:
+        ValueError: If the device or channel does not exist.
+    """
+    try:
+        info = get_audio().get_device_info_by_index(device_index)
+    except (IOError, OSError, ValueError):
+        raise ValueError(f"No audio device with index {device_index}") from None
+    if info.get("maxInputChannels", 0) < 1:
+        raise ValueError(f"Audio device {device_index} ({info['name']}) cannot record")
+    if channel is not None and not 0 <= channel < info["maxInputChannels"]:
+        raise ValueError(f"Audio device {device_index} ({info['name']}) has no channel {channel}")
+    if not label:
+        label = info["name"] if channel is None else f"{info['name']} ch{channel + 1}"
+    return CaptureSource(device_index, channel, label)
+
+def default_sources():
+    """The automatically selected input device, as a single capture source."""
+    get_audio()
+    try:
+        return [build_source(default_device_index)]
+    except ValueError:
+        return [CaptureSource(default_device_index, None, f"Device {default_device_index}")]
 
-# Initialize PyAudio
-p = pyaudio.PyAudio()
-
-# Automatically find the BlackHole device index
-DEVICE_INDEX = None
-for i in range(p.get_device_count()):
-    info = p.get_device_info_by_index(i)
-    if "BlackHole 2ch" in info['name']:
-        DEVICE_INDEX = i
-        break
-
-# Fallback to default device if BlackHole not found
-if DEVICE_INDEX is None:
-    print("Warning: BlackHole 2ch device not found. Using default device.")
-    DEVICE_INDEX = 2  # Keeping original default as fallback
-
-# Shared data for wake words, phone number, logs, etc.
-wake_words = ["justin", "mohammad", "data lake 2.0"]  # default
-phone_number = ""
-log_messages = []  # We'll store log messages here instead of SSE queue
-transcription = []
-stop_detection_flag = False
-detection_thread = None
+# Its sources are filled in once audio is initialized (see detection_loop and warm_up)
+default_session = sessions.create(name="Default", wake_words=DEFAULT_WAKE_WORDS)
 
 # API keys (will be loaded from .env if exists)
 api_keys = {
@@ -64,48 +212,287 @@ api_keys = {
 ########################
 # HELPER FUNCTIONS
 ########################
-def log_message(msg: str):
-    """
-    Append a new log message to our global list.
-    You could also limit the size here if needed.
-    """
-    print(msg)  # Also print to console
-    log_messages.append(msg)
-
-def record_audio(filename="temp.wav"):
-    stream = p.open(format=FORMAT,
-                    channels=CHANNELS,
-                    rate=RATE,
-                    input=True,
-                    frames_per_buffer=CHUNK,
-                    input_device_index=DEVICE_INDEX)
-
-    frames = []
-    for _ in range(int(RATE / CHUNK * RECORD_SECONDS)):
-        data = stream.read(CHUNK)
-        frames.append(data)
-
-    stream.stop_stream()
-    stream.close()
-
-    # Save to WAV file
-    wf = wave.open(filename, 'wb')
-    wf.setnchannels(CHANNELS)
-    wf.setsampwidth(p.get_sample_size(FORMAT))
-    wf.setframerate(RATE)
-    wf.writeframes(b''.join(frames))
-    wf.close()
-
-    return filename
-
-def transcribe(file_path):
-    print("📡 Sending to OpenAI Whisper API...")
-    with open(file_path, "rb") as audio_file:
-        transcript = client.audio.transcriptions.create(
-            model="whisper-1",
-            file=audio_file,
+def publish_event(event_type: str, message: str = None, session=None, **payload):
+    """
+    Publish a typed event to the dashboard, tagged with `session` if the
+    event belongs to one. `message` is the human-readable form; it is
+    printed to the console and included in the payload.
+    """
+    if message is not None:
+        print(f"[{session.name}] {message}" if session is not None else message)  # Also print to console
+        payload["message"] = message
+    return events.publish(event_type, payload, session.id if session is not None else None)
+
+def log_message(msg: str, session=None):
+    """
+    Publish a free-form log line (an event of type "log").
+    """
+    publish_event("log", msg, session=session)
+
+def report_circuit_state(name, state):
+    """
+    Publish circuit breaker transitions, so the dashboard shows when a
+    provider is being skipped.
+    """
+    messages = {
+        CircuitBreaker.OPEN: f"Warning: {name} keeps failing; pausing requests for {CIRCUIT_RESET_SECONDS}s.",
+        CircuitBreaker.HALF_OPEN: f"Retrying {name}...",
+        CircuitBreaker.CLOSED: f"{name} is responding again.",
+    }
+    publish_event("circuit_state", messages[state], provider=name, state=state)
+
+def build_breaker(name):
+    return CircuitBreaker(name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                          reset_seconds=CIRCUIT_RESET_SECONDS, on_state_change=report_circuit_state)
+
+# One policy per provider; transcription uploads are idempotent, so slow ones are hedged
+whisper_calls = ResilientCall("OpenAI Whisper",
+                              deadline=WHISPER_DEADLINE_SECONDS,
+                              attempt_timeout=WHISPER_ATTEMPT_SECONDS,
+                              retries=WHISPER_RETRIES,
+                              hedge_after=WHISPER_HEDGE_SECONDS,
+                              breaker=build_breaker("OpenAI Whisper"),
+                              max_workers=ASR_WORKERS * 2)
+gemini_calls = ResilientCall("Gemini",
+                             deadline=GEMINI_DEADLINE_SECONDS,
+                             attempt_timeout=GEMINI_ATTEMPT_SECONDS,
+                             retries=GEMINI_RETRIES,
+                             breaker=build_breaker("Gemini"),
+                             max_workers=SUMMARY_MAX_WORKERS + TRIGGER_WORKERS)
+# A call that timed out may still ring, so only errors that surely placed no call are retried
+twilio_calls = ResilientCall("Twilio",
+                             deadline=TWILIO_DEADLINE_SECONDS,
+                             retries=TWILIO_RETRIES,
+                             breaker=build_breaker("Twilio"),
+                             resend_if=call_was_not_placed,
+                             max_workers=2)
+
+def handle_call_event(event):
+    """
+    Log call outcomes reported by the notification dispatcher. Calls are
+    not tied to a session: triggers from several rooms calling the same
+    number share one call (or are suppressed by the cooldown).
+    """
+    if event["type"] == "call_sent":
+        message = f"  -- Phone call sent to {event['to']} --"
+    elif event["type"] == "call_suppressed":
+        message = f"Call to {event['to']} skipped: called recently (retry in {event['retry_in']}s)"
+    else:
+        message = f"Error: call to {event['to']} failed: {event['error']}"
+    publish_event(event["type"], message, **{k: v for k, v in event.items() if k != "type"})
+
+notifier = NotificationDispatcher(on_event=handle_call_event,
+                                  cooldown_seconds=CALL_COOLDOWN_SECONDS,
+                                  resilience=twilio_calls)
+
+# Worker pools shared by all sessions, so throughput is bounded by these, not by the number of rooms
+trigger_executor = ThreadPoolExecutor(max_workers=TRIGGER_WORKERS, thread_name_prefix="trigger")
+asr_executor = ThreadPoolExecutor(max_workers=ASR_WORKERS, thread_name_prefix="asr")
+summary_executor = ThreadPoolExecutor(max_workers=SUMMARY_MAX_WORKERS, thread_name_prefix="summary")
+gemini_limiter = RateLimiter(SUMMARY_REQUESTS_PER_MINUTE)
+
+def fold_summary(prompt):
+    """Gemini request for a rolling-summary fold, drawn from the shared rate budget."""
+    gemini_limiter.acquire()
+    return prompt_gemini(prompt=prompt, api_key=api_keys["gemini_api_key"], resilience=gemini_calls,
+                         request_timeout=GEMINI_ATTEMPT_SECONDS)
+
+def run_summary(session, summarizer):
+    """
+    Produce the urgent meeting summary and stream it to the browser.
+    Only the cached summary plus the not-yet-folded tail is sent.
+    """
+    summary_so_far, recent = summarizer.snapshot()
+    summary_id = uuid.uuid4().hex[:8]
+    publish_event("summary_started", session=session, summary_id=summary_id)
+    try:
+        result = summarize_transcript(
+            recent,
+            instructions="The following is from a meeting going on. The main user has been called on in the meeting and requires an urgent summarization of everything discussed. Generate a summary of everything discussed in the meeting.",
+            prior_summary=summary_so_far,
+            chunk_tokens=SUMMARY_CHUNK_TOKENS,
+            executor=summary_executor,
+            rate_limiter=gemini_limiter,
+            api_key=api_keys["gemini_api_key"],
+            resilience=gemini_calls,
+            request_timeout=GEMINI_ATTEMPT_SECONDS,
+            on_chunk=lambda chunk: publish_event("summary_chunk", session=session, summary_id=summary_id, text=chunk),
         )
-    return transcript.text
+    except Exception as e:
+        publish_event("summary_done", session=session, summary_id=summary_id, error=str(e))
+        raise
+    print(f"  -- Gemini response: {result['summary']} --")
+    archive.add_summary(session.meeting_id, result["summary"])
+    publish_event("summary_done", session=session, summary_id=summary_id, summary=result["summary"],
+                  timings=result["timings"])
+    return result
+
+def handle_trigger(session, words, summarizer):
+    """
+    Fan the trigger's actions out concurrently and return immediately:
+    the phone call goes to the notification dispatcher and the summary to
+    the trigger executor, so the detection loop keeps listening. Each
+    action's latency and outcome are collected in a per-trigger record.
+    """
+    started = time.monotonic()
+    session.last_trigger_time = time.time()
+    record = {
+        "id": next(trigger_ids),
+        "time": time.time(),
+        "words": words,
+        "call": None,
+        "summary": None,
+    }
+    session.triggers.append(record)
+    remaining = [2]
+    lock = threading.Lock()
+
+    def finish(action, outcome):
+        record[action] = outcome
+        with lock:
+            remaining[0] -= 1
+            done = remaining[0] == 0
+        if done:
+            call, summary = record["call"], record["summary"]
+            archive.add_trigger(session.meeting_id, words, record, ts=record["time"])
+            publish_event("trigger",
+                          f"Trigger {record['id']}: call {'ok' if call['ok'] else 'failed'} "
+                          f"({call['latency']:.2f}s), summary {'ok' if summary['ok'] else 'failed'} "
+                          f"({summary['latency']:.2f}s)",
+                          session=session,
+                          **record)
+
+    def call_done(future):
+        event = future.result()
+        finish("call", {
+            "ok": event["type"] == "call_sent",
+            "status": event["type"],
+            "latency": time.monotonic() - started,
+        })
+
+    def summary_done(future):
+        error = future.exception()
+        outcome = {"ok": error is None, "latency": time.monotonic() - started}
+        if error is not None:
+            outcome["error"] = str(error)
+            publish_event("error", f"Error: summary failed: {error}", session=session)
+        else:
+            outcome["timings"] = future.result()["timings"]
+        finish("summary", outcome)
+
+    trigger_executor.submit(run_summary, session, summarizer).add_done_callback(summary_done)
+    notifier.dispatch(
+        session.phone_number,
+        sid=api_keys["twilio_sid"],
+        token=api_keys["twilio_token"],
+        twilio_phone=api_keys["twilio_phone"],
+        reasons=words,
+    ).add_done_callback(call_done)
+    return record
+
+def save_debug_window(session, source, wav, window_index):
+    """
+    Debug mode only: dump the window about to be transcribed to DEBUG_AUDIO_DIR.
+    """
+    os.makedirs(DEBUG_AUDIO_DIR, exist_ok=True)
+    label = "".join(c if c.isalnum() else "_" for c in source.label)
+    filename = f"window_{session.id}_{label}_{int(time.time())}_{window_index:05d}.wav"
+    return wav.save(os.path.join(DEBUG_AUDIO_DIR, filename))
+
+def get_asr_backend():
+    """
+    Return the selected transcription backend, creating it (and loading
+    its model) on first use. The same instance serves every window.
+    """
+    global asr_backend
+    with asr_backend_lock:
+        if asr_backend is None:
+            if asr_backend_name == "openai":
+                # Retries are left to whisper_calls, which also enforces the deadline
+                options = {"api_key": api_keys["openai_api_key"], "max_connections": ASR_WORKERS,
+                           "timeout": WHISPER_ATTEMPT_SECONDS, "max_retries": 0}
+            else:
+                options = {"model": ASR_MODEL} if ASR_MODEL else {}
+            backend = create_backend(asr_backend_name, **options)
+            backend.load()
+            asr_backend = backend
+        return asr_backend
+
+def acquire_asr_backend():
+    """
+    Like get_asr_backend, but marks the backend as in use until
+    release_asr_backend, so a settings change cannot close it under an
+    upload or a run that is still using it.
+    """
+    with asr_backend_lock:
+        backend = get_asr_backend()
+        asr_backend_users[backend] = asr_backend_users.get(backend, 0) + 1
+        return backend
+
+def release_asr_backend(backend):
+    """End one use of `backend`; closes it if it was replaced and this was the last use."""
+    with asr_backend_lock:
+        asr_backend_users[backend] -= 1
+        retired = asr_backend_users[backend] == 0 and backend is not asr_backend
+        if asr_backend_users[backend] == 0:
+            del asr_backend_users[backend]
+    if retired:
+        backend.close()
+
+def reset_asr_backend():
+    """
+    Drop the current backend so the next window builds a new one
+    (after a key or backend change). Windows and runs still using the old
+    one finish on it; it is closed after the last of them.
+    """
+    global asr_backend
+    with asr_backend_lock:
+        old, asr_backend = asr_backend, None
+        if old is None or old in asr_backend_users:
+            return
+    old.close()
+
+def build_upload_encoder():
+    """
+    Create the UPLOAD_CODEC encoder, falling back to FLAC and then plain
+    WAV when the codec is not available.
+    """
+    for codec in dict.fromkeys((UPLOAD_CODEC, "flac")):
+        try:
+            return UploadEncoder(codec, RATE, CHANNELS, compression_level=UPLOAD_COMPRESSION_LEVEL)
+        except (ImportError, ValueError) as e:
+            log_message(f"Warning: {e}.")
+    log_message("Uploading uncompressed WAV.")
+    return UploadEncoder("wav", RATE, CHANNELS)
+
+def transcribe(wav, encoder=None):
+    """
+    Transcribe one window (a WavWindowBuffer) with the selected backend.
+    Backends that upload audio get it compressed by `encoder` first and
+    are called through whisper_calls (deadline, retries, hedging).
+    Returns the text and the encoder's report for this window (None if
+    nothing was encoded).
+    """
+    backend = acquire_asr_backend()
+    try:
+        upload, encoding = wav.file, None
+        if encoder is not None and backend.uploads_audio:
+            upload, encoding = encoder.encode(wav)
+        with wav.pcm() as pcm:
+            if not backend.uploads_audio:
+                return backend.transcribe(upload, pcm, RATE), encoding
+
+            data, name = upload.getvalue(), getattr(upload, "name", "window.wav")
+
+            def attempt():
+                # Each attempt (and hedge) reads its own copy of the upload
+                attempt_file = io.BytesIO(data)
+                attempt_file.name = name
+                return backend.transcribe(attempt_file, pcm, RATE)
+
+            return whisper_calls(attempt), encoding
+    finally:
+        release_asr_backend(backend)
 
 def save_env_file(api_keys_dict):
     """
@@ -129,46 +516,395 @@ def save_env_file(api_keys_dict):
 ########################
 # DETECTION LOOP
 ########################
-def detection_loop():
+def open_captures(session):
     """
-    Continuously record, transcribe, and check for wake words.
-    Logs are written to the global list.
+    Open every device the session records from, once per device: a device
+    captured by channel is opened with all of them and split into one mono
+    buffer per channel. Returns
+    (source, capture) pairs; sources whose device could not be opened are
+    reported and left out.
     """
-    global api_keys
-    log_message("Detection started. Listening for wake words...")
+    by_device = {}
+    for source in session.sources:
+        by_device.setdefault(source.device_index, []).append(source)
+
+    captures = []
+    for device_index, sources in by_device.items():
+        split = sources[0].channel is not None  # parse_sources keeps whole devices alone
+        capture = CaptureStream(get_audio(), device_index,
+                                rate=RATE,
+                                channels=CHANNELS,
+                                sample_format=FORMAT,
+                                chunk=CHUNK,
+                                buffer_seconds=CAPTURE_BUFFER_SECONDS,
+                                input_channels=[s.channel for s in sources] if split else None)
+        try:
+            capture.start()
+        except Exception as e:
+            for source in sources:
+                publish_event("error", f"Error: could not open audio device {source.label}: {e}", session=session,
+                              source=source.label)
+            continue
+        for source in sources:
+            captures.append((source, capture.channel(source.channel) if split else capture))
+    return captures
+
+def detection_loop(session):
+    """
+    Continuously transcribe one session's captured audio and check for
+    its wake words. Runs on the session's thread.
+
+    Every capture source of the session is recorded at the same time by a
+    long-lived callback stream into its own ring buffer (see
+    open_captures), so recording never
+    pauses while a window is being transcribed. Each source has its own
+    consumer thread (see source_loop) with its own voice activity gate, so
+    a silent source uploads nothing. Transcription and summaries run on
+    the shared worker pools.
+    """
+    archive.start_meeting(session.meeting_id, started=session.started, title=session.name)
+    if not session.sources:
+        session.sources = default_sources()
+    captures = open_captures(session)
+    if not captures:
+        archive.end_meeting(session.meeting_id)
+        publish_event("detection_stopped", "Detection stopped.", session=session)
+        return
+    try:
+        backend = acquire_asr_backend()  # Load the model before the first window arrives
+    except Exception as e:
+        for _, capture in captures:
+            capture.stop()
+        publish_event("error", f"Error: could not load the {asr_backend_name} transcription backend: {e}",
+                      session=session)
+        archive.end_meeting(session.meeting_id)
+        publish_event("detection_stopped", "Detection stopped.", session=session)
+        return
+    summarizer = RollingSummarizer(
+        fold_summary,
+        summary_executor,
+        fold_every_segments=SUMMARY_FOLD_SEGMENTS,
+        fold_every_seconds=SUMMARY_FOLD_SECONDS,
+        max_fold_tokens=SUMMARY_CHUNK_TOKENS,
+        on_error=lambda e: publish_event("error", f"Error updating running summary: {e}", session=session),
+    )
+    # Build and connect the Gemini client now so the first summary pays no setup cost
+    summary_executor.submit(warm_up_gemini, api_key=api_keys["gemini_api_key"],
+                            request_timeout=GEMINI_ATTEMPT_SECONDS)
+    publish_event("detection_started",
+                  "Detection started. Listening for wake words on " + ", ".join(s.label for s, _ in captures) + "...",
+                  session=session, sources=[source.label for source, _ in captures])
+
+    try:
+        spotter = build_keyword_spotter(session)
+    except Exception as e:
+        spotter = None
+        publish_event("error", f"Error loading keyword samples: {e}", session=session)
+    session.spotted_words = set(spotter.words) if spotter else set()
+
+    if STREAMING_ASR and not backend.supports_streaming:
+        log_message(f"The {asr_backend_name} backend cannot stream; transcribing {RECORD_SECONDS}s windows instead.",
+                    session=session)
+    threads = []
+    for i, (source, capture) in enumerate(captures):
+        # The spotter keeps a rolling buffer, so every source gets its own copy
+        source_spotter = spotter if spotter is None or i == 0 else copy.deepcopy(spotter)
+        threads.append(threading.Thread(target=source_loop,
+                                        args=(session, source, capture, backend, summarizer, source_spotter),
+                                        daemon=True, name=f"source-{session.id}-{i}"))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release_asr_backend(backend)  # Streams of this run were created from it
+    reported = set()  # Channels of one device share its overflow count
+    for source, capture in captures:
+        if capture.overflows and source.device_index not in reported:
+            reported.add(source.device_index)
+            log_message(f"Warning: audio device {source.device_index} overflowed {capture.overflows} times; "
+                        "some audio was lost before it reached the buffer.", session=session)
+
+    summarizer.stop()
+    archive.end_meeting(session.meeting_id)
+    publish_event("detection_stopped", "Detection stopped.", session=session)
+
+def source_loop(session, source, capture, backend, summarizer, spotter=None):
+    """
+    Consume one capture source until the session stops: windowed or
+    streaming transcription, plus the keyword spotter if `spotter` is set.
+    """
+    if spotter:
+        threading.Thread(target=keyword_loop, args=(session, source, capture, spotter, summarizer),
+                         daemon=True).start()
+    try:
+        if STREAMING_ASR and backend.supports_streaming:
+            reader = streaming_loop(session, source, capture, backend, summarizer)
+        else:
+            reader = window_loop(session, source, capture, backend, summarizer)
+    except Exception as e:
+        publish_event("error", f"Error: stopped listening to {source.label}: {e}", session=session,
+                      source=source.label)
+        return
+    finally:
+        capture.stop()
+    if reader.dropped_bytes:
+        log_message(f"Warning: {reader.dropped_bytes / capture.bytes_per_second:.1f}s of audio from {source.label} "
+                    "dropped because transcription fell behind.", session=session)
+
+def commit_segment(session, source, text, start, end, summarizer, window_id=None, **details):
+    """
+    Add a finalized piece of text heard on `source` to the session's
+    transcript, its running summary and the archive, and show it on the
+    dashboard.
+    """
+    session.transcript.append(text, start, end, window_id=window_id, source=source.label)
+    summarizer.add_segment(text)
+    archive.add_segment(session.meeting_id, start, end, text, source=source.label)
+    prefix = f"[{source.label}] " if len(session.sources) > 1 else ""
+    publish_event("transcription", f"Transcription: {prefix}{text}", session=session, text=text,
+                  source=source.label, window=window_id, **details)
+
+def build_keyword_spotter(session):
+    """
+    Load the enrolled samples of the session's wake words. Returns None
+    when keyword spotting is disabled or no word has samples.
+    """
+    if not KWS_ENABLED:
+        return None
+    spotter = KeywordSpotter(RATE)
+    loaded = spotter.enroll_directory(session.wake_words, KWS_SAMPLES_DIR)
+    if not loaded:
+        return None
+    log_message("Keyword spotter listening for: " +
+                ", ".join(f"{word} ({count} samples)" for word, count in loaded.items()), session=session)
+    return spotter
+
+def count_keyword_samples(words):
+    """
+    Number of enrolled samples per wake word.
+    """
+    counts = {}
+    for word in words:
+        directory = sample_directory(KWS_SAMPLES_DIR, word)
+        counts[word] = (len([n for n in os.listdir(directory) if n.lower().endswith(".wav")])
+                        if os.path.isdir(directory) else 0)
+    return counts
 
-    while not stop_detection_flag:
+def report_wake_words(session, source, words, summarizer, **payload):
+    """
+    Report wake words detected on `source` and start the trigger actions.
+    """
+    for word in words:
+        publish_event("wake_word", f"Wake word '{word}' detected!", session=session, word=word,
+                      source=source.label, **payload)
+    handle_trigger(session, words, summarizer)
+
+def window_loop(session, source, capture, backend, summarizer):
+    """
+    Windowed mode: transcribe consecutive (overlapping) windows of
+    RECORD_SECONDS and match wake words on each finished window.
+
+    Up to ASR_MAX_IN_FLIGHT windows are transcribed at once on the shared
+    ASR pool, each in its own WAV buffer; results are handled strictly in
+    capture order. When
+    every buffer is in flight the loop waits (backpressure) and audio
+    queues up in the capture ring buffer.
+    Returns the WindowReader once detection is stopped.
+    """
+    reader = WindowReader(capture, RECORD_SECONDS, hop_seconds=WINDOW_HOP_SECONDS)
+    encoder = build_upload_encoder() if backend.uploads_audio else None
+    transcriber = TranscriptionQueue(lambda wav: transcribe(wav, encoder),
+                                     min(ASR_MAX_IN_FLIGHT, backend.max_concurrency),
+                                     executor=asr_executor)
+    # One buffer per window in flight, plus the one being filled
+    free_buffers = [WavWindowBuffer(reader.window_bytes, RATE, CHANNELS, capture.sample_width)
+                    for _ in range(transcriber.max_in_flight + 1)]
+    window_index = 0
+    last_transcribed = 0  # Index of the last window whose transcript was handled
+    last_text = ""  # This source's last committed text, for stitching the overlap
+    started = time.monotonic()
+    vad = VoiceActivityGate(rate=RATE,
+                            energy_threshold_db=VAD_ENERGY_THRESHOLD_DB,
+                            zcr_max=VAD_ZCR_MAX,
+                            min_speech_ratio=VAD_MIN_SPEECH_RATIO,
+                            hangover_windows=VAD_HANGOVER_WINDOWS)
+
+    def handle_result(result):
+        nonlocal last_transcribed, last_text
+        index, wav, window_start = result.tag
+        free_buffers.append(wav)
+        if result.error is not None:
+            publish_event("error", f"Error: {result.error}", session=session, source=source.label)
+            return
+        raw_text, encoding = result.result
+        raw_text = raw_text.lower().strip()
+        # Only the directly preceding window shares audio with this one
+        adjacent = last_transcribed == index - 1
+        last_transcribed = index
+        previous = last_text if adjacent else ""
+        text = stitch_overlap(previous, raw_text) if WINDOW_OVERLAP_SECONDS else raw_text
+        if not text:
+            return  # Window only repeated the overlap
+        last_text = text
+        commit_segment(session, source, text, window_start, window_start + RECORD_SECONDS, summarizer, window_id=index,
+                       upload=encoding)
+
+        # Match on the boundary region too, so a wake word split across
+        # two windows is still caught (but not re-reported from the tail)
+        region, new_start = boundary_region(normalize_text(previous), normalize_text(text),
+                                            BOUNDARY_CONTEXT_WORDS)
+        hits = [h for h in session.matcher.find_all_normalized(region)
+                if h.end > new_start and h.word not in session.spotted_words]
+
+        words = list(dict.fromkeys(h.word for h in hits))
+        if words:
+            report_wake_words(session, source, words, summarizer, latency=round(result.latency, 3))
+
+        if index % ASR_STATS_EVERY == 0:
+            publish_asr_stats(session, source, transcriber, reader, started)
+
+    while not session.stop_requested:
+        try:
+            for result in transcriber.results(timeout=1.0 if transcriber.full else 0):
+                handle_result(result)
+            if transcriber.full:
+                continue  # Backpressure: wait for the oldest window before reading more audio
+
+            wav = free_buffers[-1]
+            if not wav.fill(reader, timeout=0.1 if transcriber.in_flight else 1.0):
+                continue  # Window not complete yet; collect results and re-check the stop flag
+            window_index += 1
+
+            if VAD_ENABLED:
+                with wav.pcm() as pcm:
+                    speech = vad.should_upload(pcm)
+                if not speech:
+                    continue  # Silence: skip the upload
+
+            if DEBUG_AUDIO_DIR:
+                save_debug_window(session, source, wav, window_index)
+            free_buffers.pop()
+            transcriber.submit((window_index, wav, capture.position_to_time(reader.window_start)), wav)
+
+        except Exception as e:
+            publish_event("error", f"Error: {e}", session=session, source=source.label)
+
+    for result in transcriber.close():
         try:
-            audio_path = record_audio()
-            text = transcribe(audio_path).lower().strip()
-            transcription.append(text)
-            log_message(f"Transcription: {text}")
-
-            # Check each wake word
-            for word in wake_words:
-                if word.lower() in text:
-                    log_message(f"Wake word '{word}' detected!")
-                    make_phone_call(
-                        sid=api_keys["twilio_sid"],
-                        token=api_keys["twilio_token"],
-                        phone_number=phone_number,
-                        twilio_phone=api_keys["twilio_phone"],
-                    )
-                    log_message(f"  -- Phone call sent to {phone_number} --")
-                    transcription_string = ' '.join(transcription)
-                    response = prompt_gemini(
-                        prompt=f"The following is the transcript of a meeting going on. The main user has been called on in the meeting and requires an urgent summarization of everything discussed. Generate a summary of everything discussed in the meeting. Transcription: ```{transcription_string}```",
-                        api_key=api_keys["gemini_api_key"],
-                    )
-                    log_message(f"  -- Gemini response: {response} --")
+            handle_result(result)
+        except Exception as e:
+            publish_event("error", f"Error: {e}", session=session, source=source.label)
+    publish_asr_stats(session, source, transcriber, reader, started)
+    if encoder is not None:
+        log_message(f"{source.label}: {encoder.summary()}", session=session)
+    if VAD_ENABLED:
+        log_message(f"{source.label}: {vad.summary()}", session=session)
+    return reader
+
+def publish_asr_stats(session, source, transcriber, reader, started):
+    """
+    Publish transcription throughput and backpressure: requests in flight,
+    mean request latency, time spent blocked on a full queue, how far
+    behind live audio the pipeline is, and input overflows of the device.
+    """
+    stats = transcriber.stats()
+    stats["lag_seconds"] = round(reader.lag_seconds, 2)
+    stats["overflows"] = reader.capture.overflows
+    stats["stall_ratio"] = round(stats["stall_seconds"] / max(time.monotonic() - started, 1e-9), 3)
+    message = (f"Transcription of {source.label}: {stats['completed']} windows, {stats['in_flight']} in flight, "
+               f"mean latency {stats['mean_latency']}s, {stats['lag_seconds']}s behind live audio")
+    if reader.lag_seconds > RECORD_SECONDS * 2:
+        message += " -- not keeping up with real time"
+    if stats["overflows"]:
+        message += f" ({stats['overflows']} audio input overflows)"
+    publish_event("asr_stats", message, session=session, source=source.label, **stats)
 
+def keyword_loop(session, source, capture, spotter, summarizer):
+    """
+    Run the on-device keyword spotter on its own reader of the capture
+    buffer, in KWS_FRAME_SECONDS frames. Spotted words fire the trigger
+    immediately; transcription only feeds the transcript for them.
+    """
+    reader = WindowReader(capture, KWS_FRAME_SECONDS)
+    frame = memoryview(bytearray(reader.window_bytes))
+    while not session.stop_requested:
+        try:
+            if not reader.next_window_into(frame, timeout=1.0):
+                continue  # Frame not complete yet; re-check the stop flag
+            hits = spotter.process(frame)
+            if hits:
+                latency = time.time() - capture.position_to_time(reader.position)
+                report_wake_words(session, source, [h.word for h in hits], summarizer, detector="keyword_spotter",
+                                  latency=round(latency, 3), scores={h.word: round(h.score, 2) for h in hits})
         except Exception as e:
-            log_message(f"Error: {e}")
-            print(e)
+            publish_event("error", f"Keyword spotter error: {e}", session=session, source=source.label)
+
+def streaming_loop(session, source, capture, backend, summarizer):
+    """
+    Streaming mode: feed STREAM_FRAME_SECONDS frames to an incremental
+    recognizer and match wake words on every partial hypothesis, so a name
+    is caught while the sentence is still being spoken. Each wake word
+    fires at most once per utterance; finalized utterances are committed
+    to the transcript. Silent frames are not fed to the recognizer (the
+    utterance in progress is finalized instead). Returns the WindowReader
+    once detection is stopped.
+    """
+    reader = WindowReader(capture, STREAM_FRAME_SECONDS)
+    frame = memoryview(bytearray(reader.window_bytes))
+    stream = backend.create_stream(RATE)
+    utterance_start = None
+    fired = set()  # Wake words already reported for the current utterance
+    vad = VoiceActivityGate(rate=RATE,
+                            energy_threshold_db=VAD_ENERGY_THRESHOLD_DB,
+                            zcr_max=VAD_ZCR_MAX,
+                            min_speech_ratio=VAD_MIN_SPEECH_RATIO,
+                            hangover_windows=round(VAD_STREAM_HANGOVER_SECONDS / STREAM_FRAME_SECONDS))
 
-        time.sleep(0.5)  # Short pause before next recording
+    def spot_wake_words(text):
+        words = [h.word for h in session.matcher.find_all(text)
+                 if h.word not in fired and h.word not in session.spotted_words]
+        words = list(dict.fromkeys(words))
+        if words:
+            fired.update(words)
+            # Time from the end of the frame that completed the match to detection
+            latency = time.time() - capture.position_to_time(reader.position)
+            report_wake_words(session, source, words, summarizer, latency=round(latency, 3))
 
-    log_message("Detection stopped.")
+    def finish_utterance(text):
+        nonlocal utterance_start
+        text = text.lower().strip()
+        spot_wake_words(text)  # The final hypothesis may be the first to contain the name
+        if text:
+            commit_segment(session, source, text, utterance_start, capture.position_to_time(reader.position),
+                           summarizer)
+        utterance_start = None
+        fired.clear()
+
+    while not session.stop_requested:
+        try:
+            if not reader.next_window_into(frame, timeout=1.0):
+                continue  # Frame not complete yet; re-check the stop flag
+            if VAD_ENABLED and not vad.should_upload(frame):
+                if utterance_start is not None:
+                    finish_utterance(stream.finish())
+                continue  # Silence: nothing to recognize
+            if utterance_start is None:
+                utterance_start = capture.position_to_time(reader.window_start)
+
+            text, final = stream.accept(frame)
+            if final:
+                finish_utterance(text)
+            else:
+                spot_wake_words(text)
+
+        except Exception as e:
+            publish_event("error", f"Error: {e}", session=session, source=source.label)
+
+    if utterance_start is not None:
+        finish_utterance(stream.finish())
+    if VAD_ENABLED:
+        log_message(f"{source.label}: {vad.summary()}", session=session)
+    return reader
 
 ########################
 # FLASK APP
@@ -180,8 +916,12 @@ def index():
     """Render the main page with a form to set phone number and wake words."""
     return render_template(
         "index.html",
-        phone_number=phone_number,
-        wake_words=", ".join(wake_words),
+        session_id=default_session.id,
+        phone_number=default_session.phone_number,
+        wake_words=", ".join(default_session.wake_words),
+        asr_backend=asr_backend_name,
+        keyword_samples=count_keyword_samples(default_session.wake_words),
+        asr_backends={name: backend.label for name, backend in ASR_BACKENDS.items()},
         openai_api_key=api_keys["openai_api_key"],
         twilio_sid=api_keys["twilio_sid"],
         twilio_token=api_keys["twilio_token"],
@@ -207,58 +947,418 @@ def save_api_keys():
     # Save to .env file
     env_path = save_env_file(api_keys)
     
-    # Update the client with the new API key
-    client = openai.OpenAI(api_key=api_keys["openai_api_key"])
+    # Cached clients were built with the old keys
+    reset_asr_backend()
+    invalidate_gemini_clients()
+    clear_twilio_clients()
     
-    log_message(f"API keys saved to .env file at {env_path}")
+    publish_event("api_keys_saved", f"API keys saved to .env file at {env_path}", path=env_path)
     
     return redirect(url_for("index"))
 
 @app.route("/update_settings", methods=["POST"])
 def update_settings():
     """
-    Endpoint to update phone number and wake words from the user form,
-    then redirect back to home.
+    Endpoint to update the default session's phone number and wake words
+    from the user form, then redirect back to home.
+    """
+    global asr_backend_name
+    default_session.phone_number = request.form.get("phone_number", "")
+    default_session.set_wake_words(request.form.get("wake_words", "").split(","))
+    backend = request.form.get("asr_backend", asr_backend_name)
+    if backend in ASR_BACKENDS and backend != asr_backend_name:
+        asr_backend_name = backend
+        reset_asr_backend()
+    return redirect(url_for("index"))
+
+@app.route("/enroll_keyword", methods=["POST"])
+def enroll_keyword():
     """
-    global phone_number, wake_words
-    phone_number = request.form.get("phone_number", "")
-    words = request.form.get("wake_words", "")
-    wake_words = [w.strip() for w in words.split(",") if w.strip()]
+    Store uploaded WAV recordings of a wake word as keyword-spotter
+    samples, then redirect back to home. Samples are loaded when detection
+    next starts.
+    """
+    word = request.form.get("word", "")
+    if not any(word in session.wake_words for session in sessions.list()):
+        publish_event("error", f"Error: '{word}' is not a configured wake word.")
+        return redirect(url_for("index"))
+
+    directory = sample_directory(KWS_SAMPLES_DIR, word)
+    os.makedirs(directory, exist_ok=True)
+    saved = 0
+    for upload in request.files.getlist("samples"):
+        path = os.path.join(directory, f"{uuid.uuid4().hex[:8]}.wav")
+        upload.save(path)
+        try:
+            KeywordSpotter(RATE).enroll(word, load_wav(path, RATE))  # Reject unusable recordings now
+        except Exception as e:
+            os.remove(path)
+            publish_event("error", f"Error: sample {upload.filename} rejected: {e}")
+            continue
+        saved += 1
+    log_message(f"Saved {saved} sample(s) for '{word}'; they are used from the next detection start.")
     return redirect(url_for("index"))
 
+def start_session(session):
+    """Start the session's detection thread if it is not running."""
+    if session.start(detection_loop):
+        log_message("Detection thread started.", session=session)
+
+def stop_session(session):
+    """Signal the session's detection loop to stop."""
+    session.stop()
+    publish_event("detection_stopping", "Stopping detection thread...", session=session)
+
+def requested_session():
+    """
+    The session named by the `session` query parameter (the default
+    session if absent). Aborts with 404 for an unknown id.
+    """
+    session_id = request.args.get("session")
+    if not session_id:
+        return default_session
+    try:
+        return sessions.get(session_id)
+    except KeyError:
+        abort(404, description=f"No session {session_id!r}")
+
+def parse_sources(data):
+    """
+    Capture sources from request data: `sources`, a list of device indices
+    or of {"device_index", "channel", "label"} objects, or a single
+    `device_index` (with an optional `channel`). Returns None if neither is
+    given; aborts with 400 for unknown devices or channels, for a source
+    listed twice, and for a device used both as a whole and by channel.
+    """
+    if data.get("sources"):
+        specs = data["sources"]
+        if not isinstance(specs, list):
+            abort(400, description="sources must be a list")
+    elif data.get("device_index") not in (None, ""):
+        specs = [{"device_index": data["device_index"], "channel": data.get("channel")}]
+    else:
+        return None
+
+    sources = []
+    for spec in specs:
+        if not isinstance(spec, dict):
+            spec = {"device_index": spec}
+        try:
+            channel = spec.get("channel")
+            source = build_source(int(spec.get("device_index")),
+                                  int(channel) if channel not in (None, "") else None,
+                                  spec.get("label"))
+        except (TypeError, ValueError) as e:
+            abort(400, description=f"Invalid source {spec}: {e}")
+        for other in sources:
+            if other.device_index != source.device_index:
+                continue
+            if other.channel == source.channel:
+                abort(400, description=f"Source {source.label} is listed twice")
+            if other.channel is None or source.channel is None:
+                abort(400, description=f"Device {source.device_index} cannot be used both as a whole and by channel")
+        if any(s.label == source.label for s in sources):
+            source = source._replace(label=f"{source.label} ({len(sources) + 1})")  # Labels tag transcripts
+        sources.append(source)
+    return sources
+
+def session_settings(data):
+    """
+    Validate session settings from a JSON body or form: `name`, `sources`
+    (see parse_sources), `wake_words` (list or comma-separated) and
+    `phone_number`. Only the fields present are returned.
+    """
+    settings = {}
+    if data.get("name"):
+        settings["name"] = str(data["name"])
+    sources = parse_sources(data)
+    if sources is not None:
+        settings["sources"] = sources
+    if "wake_words" in data:
+        words = data["wake_words"]
+        settings["wake_words"] = words.split(",") if isinstance(words, str) else [str(w) for w in words]
+    if "phone_number" in data:
+        settings["phone_number"] = str(data["phone_number"])
+    return settings
+
+@app.route("/devices", methods=["GET"])
+def get_devices():
+    """
+    Return the audio input devices (index, name, channel count, default
+    sample rate, host API), for choosing a session's capture sources.
+    """
+    return jsonify(list_input_devices(get_audio()))
+
 @app.route("/start_detection", methods=["POST"])
 def start_detection():
-    """Start the background detection thread if not running."""
-    global detection_thread, stop_detection_flag
-    if detection_thread is None or not detection_thread.is_alive():
-        stop_detection_flag = False
-        detection_thread = threading.Thread(target=detection_loop, daemon=True)
-        detection_thread.start()
-        log_message("Detection thread started.")
+    """Start detection for the default session."""
+    start_session(default_session)
     return ("", 204)
 
 @app.route("/stop_detection", methods=["POST"])
 def stop_detection():
-    """Signal the detection loop to stop."""
-    global stop_detection_flag
-    stop_detection_flag = True
-    log_message("Stopping detection thread...")
+    """Stop detection for the default session."""
+    stop_session(default_session)
+    return ("", 204)
+
+@app.route("/sessions", methods=["GET"])
+def list_sessions():
+    """Return every session with its settings and state."""
+    return jsonify([session.to_dict() for session in sessions.list()])
+
+@app.route("/sessions", methods=["POST"])
+def create_session():
+    """
+    Create a session from a JSON body (or form) with `name`, `sources`
+    (or `device_index`), `wake_words` and `phone_number`; unset fields use
+    the defaults. Pass `"start": true` to start it right away.
+    """
+    data = request.get_json(silent=True) or request.form
+    settings = session_settings(data)
+    if "sources" not in settings:
+        settings["sources"] = default_sources()
+    settings.setdefault("wake_words", DEFAULT_WAKE_WORDS)
+    try:
+        session = sessions.create(**settings)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    log_message(f"Session {session.name} created.", session=session)
+    if data.get("start") in (True, "1", "true"):
+        start_session(session)
+    return jsonify(session.to_dict()), 201
+
+@app.route("/sessions/<session_id>", methods=["GET"])
+def get_session(session_id):
+    """Return one session's settings and state."""
+    try:
+        return jsonify(sessions.get(session_id).to_dict())
+    except KeyError:
+        abort(404, description=f"No session {session_id!r}")
+
+@app.route("/sessions/<session_id>", methods=["PATCH"])
+def update_session(session_id):
+    """
+    Change a session's wake words or phone number (applied immediately),
+    or its name or capture sources (applied from the next start).
+    """
+    try:
+        session = sessions.get(session_id)
+    except KeyError:
+        abort(404, description=f"No session {session_id!r}")
+    settings = session_settings(request.get_json(silent=True) or request.form)
+    if "wake_words" in settings:
+        session.set_wake_words(settings.pop("wake_words"))
+    for key, value in settings.items():
+        setattr(session, key, value)
+    return jsonify(session.to_dict())
+
+@app.route("/sessions/<session_id>/start", methods=["POST"])
+def start_session_route(session_id):
+    """Start detection for a session."""
+    try:
+        session = sessions.get(session_id)
+    except KeyError:
+        abort(404, description=f"No session {session_id!r}")
+    start_session(session)
+    return jsonify(session.to_dict())
+
+@app.route("/sessions/<session_id>/stop", methods=["POST"])
+def stop_session_route(session_id):
+    """Stop detection for a session; it finishes the windows in flight first."""
+    try:
+        session = sessions.get(session_id)
+    except KeyError:
+        abort(404, description=f"No session {session_id!r}")
+    stop_session(session)
+    return jsonify(session.to_dict())
+
+@app.route("/sessions/<session_id>", methods=["DELETE"])
+def delete_session(session_id):
+    """
+    Stop a session and remove it without waiting for its windows in flight:
+    202 if it is still finishing, 204 if it was already stopped. The
+    default session cannot be removed.
+    """
+    if session_id == default_session.id:
+        return jsonify({"error": "The default session cannot be removed"}), 400
+    try:
+        session = sessions.remove(session_id)
+    except KeyError:
+        abort(404, description=f"No session {session_id!r}")
+    log_message(f"Session {session.name} removed.", session=session)
+    if session.running:
+        return jsonify(session.to_dict()), 202
     return ("", 204)
 
+def session_matches(event, session_id):
+    """Whether `event` passes a `session` filter (None means no filter)."""
+    return session_id is None or event.session_id in (None, session_id)
+
 @app.route("/logs", methods=["GET"])
 def get_logs():
     """
-    Return current log messages as JSON.
-    The front-end polls this endpoint to display logs.
+    Return events newer than the `since` cursor as JSON:
+    {"events": [...], "next": <cursor>, "truncated": <bool>}.
+    Clients without Server-Sent Events support poll this endpoint with the
+    last cursor they received; when nothing new happened they get a 304
+    via the ETag. With `session`, only that session's events (and those
+    not tied to any session) are returned.
     """
-    return jsonify(log_messages)
+    since = request.args.get("since", default=0, type=int)
+    session_id = request.args.get("session")
+    etag = f'"{events.last_seq}-{since}-{session_id or "all"}"'
+    if request.headers.get("If-None-Match") == etag:
+        return ("", 304, {"ETag": etag, "Cache-Control": "no-cache"})
+
+    new_events, cursor, truncated = events.since(since)
+    response = jsonify({
+        "events": [event.to_dict() for event in new_events if session_matches(event, session_id)],
+        "next": cursor,
+        "truncated": truncated,
+    })
+    response.headers["ETag"] = f'"{cursor}-{since}-{session_id or "all"}"'
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route("/events", methods=["GET"])
+def stream_events():
+    """
+    Server-Sent Events push channel carrying every event as it is
+    published, so the dashboard does not have to poll. Each SSE id is the
+    event sequence number; a reconnecting browser sends it back as
+    Last-Event-ID and resumes where it left off. Accepts the same
+    `session` filter as /logs.
+    """
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", default=0, type=int)
+    session_id = request.args.get("session")
+
+    def generate(cursor):
+        yield "retry: 2000\n\n"
+        while True:
+            new_events, cursor, _ = events.wait_since(cursor, timeout=15)
+            if not new_events:
+                yield ": ping\n\n"  # Keep-alive; also detects closed connections
+                continue
+            for event in new_events:
+                if not session_matches(event, session_id):
+                    continue
+                yield f"id: {event.seq}\ndata: {event.to_json()}\n\n"
+
+    return Response(generate(since), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/transcript", methods=["GET"])
+def get_transcript():
+    """
+    Return transcript segments for a time range as JSON. Query parameters:
+    `session` (default session if absent), `source` (a capture source
+    label), `minutes` (the last N minutes), `since` (epoch seconds, or
+    "last_trigger" for everything since the last wake word) and `until`
+    (epoch seconds).
+    """
+    session = requested_session()
+    minutes = request.args.get("minutes", type=float)
+    if request.args.get("since") == "last_trigger":
+        start = session.last_trigger_time or 0.0
+    elif minutes is not None:
+        start = time.time() - minutes * 60
+    else:
+        try:
+            start = float(request.args.get("since") or 0.0)
+        except ValueError:
+            abort(400, description="since must be epoch seconds or 'last_trigger'")
+    end = request.args.get("until", default=float("inf"), type=float)
+    segments = session.transcript.range(start, end, source=request.args.get("source"))
+    return jsonify([segment.to_dict() for segment in segments])
+
+@app.route("/triggers", methods=["GET"])
+def get_triggers():
+    """
+    Return a session's recent trigger records (`session` query parameter,
+    default session if absent): matched wake words plus the outcome and
+    latency of the call and summary each one started.
+    """
+    return jsonify(list(requested_session().triggers))
+
+@app.route("/search", methods=["GET"])
+def search_archive():
+    """
+    Full-text search across all archived meetings. Query parameters: `q`
+    (required), `since` / `until` (epoch seconds), `kind` ("segment",
+    "summary" or "trigger") and `limit`. Returns ranked hits with snippets
+    and their offset into the meeting.
+    """
+    query = request.args.get("q", default="").strip()
+    if not query:
+        return jsonify({"error": "Missing query parameter 'q'"}), 400
+    results = archive.search(
+        query,
+        limit=request.args.get("limit", default=20, type=int),
+        since=request.args.get("since", type=float),
+        until=request.args.get("until", type=float),
+        kind=request.args.get("kind") or None,
+    )
+    return jsonify(results)
+
+@app.route("/resilience", methods=["GET"])
+def get_resilience():
+    """Return call, retry, timeout and hedge counters plus the circuit state per provider."""
+    return jsonify({policy.name: policy.stats() for policy in (whisper_calls, gemini_calls, twilio_calls)})
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """
+    Readiness probe: answers as soon as the server can serve the dashboard
+    (the launcher waits on it before opening the browser). `warm_up` shows
+    which slow components have been loaded in the background so far.
+    """
+    response = jsonify({
+        "status": "ok",
+        "warm_up": dict(warm_up_status),
+        "sessions_running": len(sessions.running()),
+    })
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+@app.route("/meetings", methods=["GET"])
+def get_meetings():
+    """Return the archived meetings, most recent first."""
+    return jsonify(archive.meetings(limit=request.args.get("limit", default=50, type=int)))
+
+# Progress of the background warm-up: "pending", "ready" or "error: ..." per component
+warm_up_status = {"audio": "pending", "sdks": "pending"}
+
+def warm_up():
+    """
+    Load what the first detection run needs, off the request path: PyAudio
+    and the device scan, then the provider SDKs. Each step also happens on
+    first use, so nothing waits for this thread.
+    """
+    try:
+        if not default_session.sources:
+            default_session.sources = default_sources()
+        warm_up_status["audio"] = "ready"
+        # Log which audio devices the default session uses
+        for source in default_session.sources:
+            log_message(f"Using audio device: {source.label} (index {source.device_index})")
+    except Exception as e:
+        warm_up_status["audio"] = f"error: {e}"
+        publish_event("error", f"Error: could not initialize audio: {e}")
+
+    failed = []
+    for module in WARM_UP_IMPORTS:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            failed.append(module)
+    warm_up_status["sdks"] = f"error: missing {', '.join(failed)}" if failed else "ready"
 
 if __name__ == "__main__":
     try:
-        # Log which audio device we're using
-        device_info = p.get_device_info_by_index(DEVICE_INDEX)
-        log_message(f"Using audio device: {device_info['name']} (index {DEVICE_INDEX})")
-        
+        threading.Thread(target=warm_up, daemon=True, name="warm-up").start()
+
         # Try to run on port 5000, but if unavailable, use 8080 instead
         try:
             log_message("Starting server on port 5000...")
@@ -270,4 +1370,6 @@ if __name__ == "__main__":
             else:
                 raise
     finally:
-        p.terminate()
\ No newline at end of file
+        archive.flush()  # Commit queued transcript and summary writes before exiting
+        if audio is not None:
+            audio.terminate()
\ No newline at end of file
@@ -7,47 +7,78 @@ opens the website in your default browser.
 """
 import os
 import sys
+import json
 import time
 import threading
 import webbrowser
 import subprocess
+import urllib.request
 
-def open_browser():
+# app.py serves on port 5000, or on 8080 if 5000 is taken
+HEALTH_URLS = ["http://127.0.0.1:5000/healthz", "http://127.0.0.1:8080/healthz"]
+STARTUP_TIMEOUT = 60  # Seconds to wait for the server before giving up
+POLL_INTERVAL = 0.05
+
+def wait_for_server(server, timeout=STARTUP_TIMEOUT):
+    """
+    Poll the server's /healthz readiness endpoint until it answers.
+    Returns the URL of the page, or None if the server exited or did not
+    come up within `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and server.poll() is None:
+        for url in HEALTH_URLS:
+            try:
+                with urllib.request.urlopen(url, timeout=0.5) as response:
+                    # Another program may own the port; only our server answers like this
+                    if json.load(response).get("status") == "ok":
+                        return url[:-len("healthz")]
+            except (OSError, ValueError):
+                pass  # Not up yet (or not our server)
+        time.sleep(POLL_INTERVAL)
+    return None
+
+def open_browser(server):
     """
-    Wait a moment for the Flask server to start,
-    then open the website in the default browser
+    Wait until the Flask server is ready, then open the website in the
+    default browser
     """
-    # Short delay to let the server start up
-    time.sleep(1.5)
-    url = "http://127.0.0.1:5000/"
+    url = wait_for_server(server)
+    if url is None:
+        if server.poll() is None:
+            print(f"Server did not become ready within {STARTUP_TIMEOUT}s; open http://127.0.0.1:5000/ manually.")
+        return
     print(f"Opening {url} in your browser...")
     webbrowser.open(url)
 
 if __name__ == "__main__":
     # Get the directory of this script
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    
+
     # Path to app.py (assuming it's in the same directory)
     app_path = os.path.join(script_dir, "flask_app/app.py")
-    
+
     if not os.path.exists(app_path):
         print(f"Error: Could not find {app_path}")
         sys.exit(1)
-    
-    # Start a thread to open the browser after a short delay
-    browser_thread = threading.Thread(target=open_browser)
-    browser_thread.daemon = True
-    browser_thread.start()
-    
+
     # Print information
     print("Starting Flask server...")
     print("Press CTRL+C to stop the server")
-    
+
+    # Run the Flask app as a subprocess
+    # This way, any output from app.py will be shown in the console
+    server = subprocess.Popen([sys.executable, app_path])
+
+    # Start a thread to open the browser as soon as the server is ready
+    browser_thread = threading.Thread(target=open_browser, args=(server,))
+    browser_thread.daemon = True
+    browser_thread.start()
+
     try:
-        # Run the Flask app as a subprocess
-        # This way, any output from app.py will be shown in the console
-        subprocess.run([sys.executable, app_path], check=True)
+        returncode = server.wait()
+        if returncode != 0:
+            print(f"\nServer encountered an error (exit code {returncode})")
     except KeyboardInterrupt:
+        server.wait()  # CTRL+C reaches the server too; let it shut down
         print("\nServer stopped by user")
-    except subprocess.CalledProcessError as e:
-        print(f"\nServer encountered an error: {e}")
\ No newline at end of file